@@ -4,7 +4,11 @@ ROBUST ENERGYPLUS API - Real simulation with proper output parsing
 No mock data - only real results or clear errors
 """
 
+import bisect
+import copy
+import hashlib
 import json
+import mmap
 import os
 import socket
 import threading
@@ -15,17 +19,230 @@ import logging
 import re
 import uuid
 import shutil
+import signal
 import time
 from pathlib import Path
+from urllib.parse import parse_qs
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Optional faster JSON encoder/decoder - falls back to the standard library json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Configure logging - LOG_LEVEL=WARNING drops the per-request INFO lines (and, for the
+# lazily formatted ones, their formatting cost) in production. Unknown names fall back to INFO
+# (getLevelNamesMapping is Python 3.11+, older versions only have the private mapping)
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_LEVEL_NAMES = logging.getLevelNamesMapping() if hasattr(logging, 'getLevelNamesMapping') else logging._nameToLevel
+logging.basicConfig(level=LOG_LEVEL_NAMES.get(LOG_LEVEL, logging.INFO))
 logger = logging.getLogger(__name__)
+if LOG_LEVEL not in LOG_LEVEL_NAMES:
+    logger.warning(f"⚠️  Unknown LOG_LEVEL '{LOG_LEVEL}' - using INFO")
+
+# HTTP headers looked up directly in the header block (names are case-insensitive)
+CONTENT_LENGTH_HEADER_PATTERN = re.compile(rb'^content-length:[ \t]*(\d+)', re.IGNORECASE | re.MULTILINE)
+HOST_HEADER_PATTERN = re.compile(r'^host:[ \t]*([^\r\n]*)', re.IGNORECASE | re.MULTILINE)
+
+# POST endpoints taking a JSON body: path -> name of the handler method
+# (called with the client socket, body, base URL and pretty flag)
+POST_ROUTES = {
+    '/simulate': 'handle_simulate',
+    '/simulate_batch': 'handle_simulate_batch',
+    '/simulate_raw': 'handle_simulate_raw',
+}
+
+# RunPeriod end/begin dates read by get_simulation_period_days
+RUN_PERIOD_END_PATTERN = re.compile(
+    r'RunPeriod[^]*?End_Month[^\d]*(\d+)[^]*?End_Day[^\d]*(\d+)',
+    re.MULTILINE | re.DOTALL
+)
+RUN_PERIOD_BEGIN_PATTERN = re.compile(
+    r'Begin_Month[^\d]*(\d+)[^]*?Begin_Day[^\d]*(\d+)',
+    re.MULTILINE | re.DOTALL
+)
+
+# RunPeriod layouts rewritten by optimize_idf_for_fast_simulation, tried in order:
+# fields with "!-" comments, any one-field-per-line layout, then bare End_Month/End_Day
+RUN_PERIOD_COMMENTED_PATTERN = re.compile(
+    r'(RunPeriod,\s*\n\s*[^,]+,\s*\n\s*)(\d+)(\s*,\s*!\s*-.*?\n\s*)(\d+)(\s*,\s*!\s*-.*?\n\s*)(\d+)(\s*,\s*!\s*-.*?\n\s*)(\d+)',
+    re.MULTILINE
+)
+RUN_PERIOD_SIMPLE_PATTERN = re.compile(
+    r'(RunPeriod,[^\n]*\n[^\n]*\n\s*)(\d+)(\s*,\s*[^\n]*\n\s*)(\d+)(\s*,\s*[^\n]*\n\s*)(\d+)(\s*,\s*[^\n]*\n\s*)(\d+)',
+    re.MULTILINE
+)
+RUN_PERIOD_END_FIELDS_PATTERN = re.compile(r'(End_Month[^\d]*)(\d+)([^\d]*End_Day[^\d]*)(\d+)')
+
+# Output:SQLite option type checks in run_energyplus_simulation
+# (the option field is rewritten in place at the match position - Output:SQLite is a unique object)
+SQLITE_OPTION_PATTERN = re.compile(r'Output:SQLite,\s*\n\s*([^;!]+)')
+SQLITE_SIMPLE_OPTION = 'Output:SQLite,\n    Simple;        !- Option Type'
+
+# HTML summary: building area rows (groups 1-3 in priority order, value in group 4),
+# the annual End Uses table and the numeric cells of a table row. Bytes patterns:
+# the report is scanned as read from disk, without decoding it to str first
+HTML_AREA_PATTERN = re.compile(
+    rb'(?:(Net\s+Conditioned\s+Building)|(Total\s+Building)|(Total\s+Floor))\s+Area</td>\s*<td[^>]*>\s*([\d.]+)',
+    re.IGNORECASE
+)
+HTML_END_USES_TABLE_PATTERN = re.compile(
+    rb'Annual Building Utility Performance Summary.*?<b>End Uses</b>.*?<table[^>]*>(.*?)</table>',
+    re.DOTALL | re.IGNORECASE
+)
+HTML_NUMERIC_CELL_PATTERN = re.compile(rb'<td[^>]*>\s*([\d.]+)\s*</td>')
+
+# Envelope objects read by extract_thermal_properties - matched in a single pass
+# over the IDF instead of one full scan per object type
+THERMAL_OBJECT_PATTERN = re.compile(
+    r'(Material|WindowMaterial:SimpleGlazingSystem|WindowMaterial:Glazing),\s*([^;]+);',
+    re.DOTALL
+)
+
+# Rows of the HTML End Uses table: first cell is the row label, rest are the values
+END_USES_ROW_PATTERN = re.compile(rb'<td[^>]*>([^<]*)</td>(.*?)</tr>', re.DOTALL)
+
+# A plain decimal CSV field (e.g. "472.78", "-1.5E+03") - checked before float()
+# so non-numeric fields are skipped without raising
+NUMERIC_FIELD_PATTERN = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+
+# Row labels read from the HTML End Uses table
+END_USE_CATEGORIES = (
+    'Heating',
+    'Cooling',
+    'Interior Lighting',
+    'Interior Equipment',
+    'Exterior Equipment',
+    'Fans',
+    'Pumps',
+    'Heat Rejection',
+    'Humidification',
+    'Heat Recovery',
+    'Water Systems',
+    'Refrigeration',
+    'Exterior Lighting',
+)
+
+# Content types for downloadable output files, by file extension
+DOWNLOAD_CONTENT_TYPES = {
+    '.html': 'text/html',
+    '.htm': 'text/html',
+    '.csv': 'text/csv',
+    '.json': 'application/json',
+    '.sql': 'application/x-sqlite3',
+    '.txt': 'text/plain',
+    '.err': 'text/plain',
+    '.xml': 'application/xml',
+}
+
+# The six main end-use categories reported in the energy breakdown
+BREAKDOWN_FIELDS = ('heating_energy', 'cooling_energy', 'lighting_energy', 'equipment_energy', 'fans_energy', 'pumps_energy')
+
+# Unit conversions for EnergyPlus outputs (meters are reported in J, HTML tables in GJ)
+J_PER_KWH = 3600000
+KWH_PER_GJ = 277.778
+
+# kWh per unit for SQLite meter/report values, keyed by upper-cased unit name;
+# unknown or missing units are assumed to be J (EnergyPlus default)
+KWH_PER_UNIT = {
+    'J': 1 / J_PER_KWH,
+    'JOULES': 1 / J_PER_KWH,
+    'GJ': KWH_PER_GJ,
+    'KWH': 1.0,
+}
+
+# Peak demand estimate: average hourly use over 2920 operating hours/year (typical
+# commercial building) times a 1.3 peak factor, folded into one multiplier
+PEAK_DEMAND_FACTOR = 1.3 / 2920
+
+# Number of IDFs whose thermal properties are kept in memory
+THERMAL_CACHE_SIZE = 32
+
+# Number of successful simulation results kept for identical IDF/weather resubmissions
+RESULT_CACHE_SIZE = 128
+
+# Threads used to parse a simulation's HTML/MTR/CSV/SQLite outputs concurrently
+OUTPUT_PARSER_WORKERS = 4
+
+# Request buffer growth step and maximum size of a single socket read
+RECV_BUFFER_SIZE = 65536
+
+# Seconds a client may stay silent while sending a request, and the total time allowed
+# for the request line and headers (a client trickling header bytes can't hold a worker)
+REQUEST_READ_TIMEOUT = 30.0
+REQUEST_HEADER_DEADLINE = 30.0
+
+# Largest request line + header block accepted (bytes) - larger ones get 431
+MAX_HEADER_SIZE = 64 * 1024
+
+# Time allowed for the body: a fixed allowance plus Content-Length at a minimum transfer rate
+# (bytes/second), so a client trickling a large declared body can't hold a worker indefinitely.
+# 32 KiB/s (~256 kbit/s) leaves room for slow uplinks; clients that miss the deadline get 408
+REQUEST_BODY_DEADLINE = 30.0
+REQUEST_BODY_MIN_RATE = 32 * 1024
+
+# When a response goes out before the request body was read (e.g. 413), the rest of the upload
+# is read and discarded for at most this many seconds/bytes so the client gets to see the response
+REQUEST_DRAIN_TIMEOUT = 5.0
+REQUEST_DRAIN_LIMIT = 64 * 1024 * 1024
+
+# Pending connections the kernel queues while every regular and reserved request worker is busy
+LISTEN_BACKLOG = 1024
+
+# Kernel receive/send buffer per connection - room for large IDF uploads and JSON replies
+SOCKET_BUFFER_SIZE = 1 << 20
+
+# Expected JSON types of the /simulate request fields (all optional except idf_content)
+SIMULATE_REQUEST_FIELDS = {
+    'idf_content': str,
+    'weather_content': str,
+    'measured_data': dict,
+}
+
+# Status line and headers of every JSON response (filled in with the status and body length)
+JSON_RESPONSE_HEADER = (
+    b"HTTP/1.1 %s\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: %d\r\n"
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Connection: close\r\n"
+    b"\r\n"
+)
+
+# Status line and headers of /download responses (content type, length, file name)
+DOWNLOAD_RESPONSE_HEADER = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: %s\r\n"
+    b"Content-Length: %d\r\n"
+    b"Content-Disposition: attachment; filename=\"%s\"\r\n"
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Connection: close\r\n"
+    b"\r\n"
+)
+
+# EUI thresholds (kWh/m²/year) and the (rating, score) for each band between them -
+# an EUI equal to a threshold falls in the band above it
+PERFORMANCE_RATING_THRESHOLDS = (100, 150, 200, 250)
+PERFORMANCE_RATINGS = (
+    ("Excellent", 95),
+    ("Good", 80),
+    ("Average", 65),
+    ("Below Average", 50),
+    ("Poor", 35),
+)
+
+def performance_rating_for_eui(eui):
+    """Return (rating, score) for an energy intensity in kWh/m²/year"""
+    return PERFORMANCE_RATINGS[bisect.bisect_right(PERFORMANCE_RATING_THRESHOLDS, eui)]
+
 
 class RobustEnergyPlusAPI:
-    def __init__(self):
+    def __init__(self, worker_processes=1, run_cleanup=True):
+        """worker_processes: server processes sharing the host (the simulation cap is split across them),
+        run_cleanup: start the hourly output cleanup thread (only one process should)"""
         self.version = "33.0.0"
-        self.current_idf_content = None  # Store IDF content for analysis
         self.host = '0.0.0.0'
         self.port = int(os.environ.get('PORT', 8080))
         
@@ -52,9 +269,52 @@ class RobustEnergyPlusAPI:
         logger.info(f"📁 Output files storage: {self.storage_dir}")
         logger.info(f"⏰ File retention: {self.file_retention_hours} hours")
         
-        # Base URL for file downloads (will be set from request)
+        # Simulation settings - read once here rather than from os.environ on every request
+        # SIMULATION_TIMEOUT <= 60s (free tier) shortens IDFs to a 1-week run unless DISABLE_IDF_OPTIMIZATION=true
+        self.simulation_timeout = int(os.environ.get('SIMULATION_TIMEOUT', 55))
+        self.disable_idf_optimization = os.environ.get('DISABLE_IDF_OPTIMIZATION', 'false').lower() == 'true'
+        self.skip_energy_extraction = os.environ.get('SKIP_ENERGY_EXTRACTION', 'false').lower() == 'true'
+        
+        # Default base URL for file downloads - requests with a Host header use their own instead
         self.base_url = os.environ.get('BASE_URL', '')
         
+        # Thermal properties keyed by IDF content digest (LRU)
+        # add_calculated_metrics runs more than once per simulation and clients
+        # often re-submit the same IDF, so avoid re-scanning it each time
+        self.thermal_cache = OrderedDict()
+        self.thermal_cache_lock = threading.Lock()
+        
+        # Successful simulation results keyed by IDF/weather content digest (LRU)
+        # "What-if" clients resubmit unchanged models - EnergyPlus is deterministic, so reuse the result
+        self.result_cache = OrderedDict()
+        self.result_cache_lock = threading.Lock()
+        
+        # Shared pool for parsing output files - file reads and SQLite queries release the GIL
+        self.output_parser_pool = ThreadPoolExecutor(max_workers=OUTPUT_PARSER_WORKERS, thread_name_prefix='output-parser')
+        
+        # Largest request body accepted (bytes) - IDF and EPW content arrive inline as JSON strings
+        self.max_request_size = int(os.environ.get('MAX_REQUEST_SIZE', 100 * 1024 * 1024))
+        
+        # Threads serving connections - bounded so a burst of clients can't spawn unlimited threads
+        self.max_workers = int(os.environ.get('MAX_WORKERS', min(32, (os.cpu_count() or 4) * 4)))
+        
+        # Extra workers for /health and /download while every regular worker is busy - other
+        # requests arriving then are refused with 503 instead of queueing behind the simulations
+        self.reserved_workers = int(os.environ.get('RESERVED_WORKERS', 2))
+        
+        # EnergyPlus processes allowed to run at once (defaults to one per CPU) - more would
+        # only time-slice the same cores and push every run closer to SIMULATION_TIMEOUT.
+        # The limit is for the whole host, so each worker process gets its share (at least one)
+        self.max_concurrent_simulations = max(1, int(os.environ.get('MAX_CONCURRENT_SIMULATIONS', os.cpu_count() or 1)) // worker_processes)
+        self.simulation_slots = threading.BoundedSemaphore(self.max_concurrent_simulations)
+        
+        # Simulations run concurrently by /simulate_batch (defaults to one per CPU)
+        self.simulation_batch_workers = int(os.environ.get('SIMULATION_BATCH_WORKERS', os.cpu_count() or 1))
+        
+        # Most simulations one /simulate_batch request may ask for - a huge batch would hold the
+        # shared simulation slots long after the client's connection has timed out
+        self.max_batch_size = int(os.environ.get('MAX_BATCH_SIZE', 20))
+        
         logger.info(f"🚀 Robust EnergyPlus API v{self.version} starting...")
         logger.info(f"📊 EnergyPlus EXE: {self.energyplus_exe}")
         logger.info(f"📊 EnergyPlus IDD: {self.energyplus_idd}")
@@ -67,8 +327,34 @@ class RobustEnergyPlusAPI:
         else:
             logger.info("✅ Service ready with EnergyPlus available")
         
-        # Start cleanup thread
-        self.start_cleanup_thread()
+        # Health response is constant apart from the availability flag and timestamp -
+        # serialize both variants once (compact, without the closing brace) and append the timestamp per request
+        self.health_body_prefixes = {
+            available: self.encode_json({
+                "status": "healthy",
+                "version": self.version,
+                "energyplus_available": available,
+                "energyplus_exe": self.energyplus_exe,
+                "energyplus_idd": self.energyplus_idd
+            })[:-1]
+            for available in (True, False)
+        }
+        
+        # Same for the fixed-message error responses sent on malformed requests
+        self.error_body_prefixes = {
+            error_msg: self.encode_json({
+                "version": self.version,
+                "simulation_status": "error",
+                "error_message": error_msg
+            })[:-1]
+            for error_msg in ("Empty request", "Unknown endpoint", "Missing idf_content", "Missing simulations", "Server busy",
+                              "Request timeout", "Request headers too large")
+        }
+        
+        # Start cleanup thread - with several worker processes only the parent sweeps the shared
+        # storage directory, otherwise they all remove the same directories at once
+        if run_cleanup:
+            self.start_cleanup_thread()
     
     def test_energyplus(self):
         """Test EnergyPlus installation - graceful failure"""
@@ -161,16 +447,19 @@ class RobustEnergyPlusAPI:
     
     def get_simulation_period_days(self, idf_content):
         """Extract simulation period in days from IDF"""
+        # Cheap substring check before the DOTALL regex scans - most of the IDF is other objects
+        if 'RunPeriod' not in idf_content:
+            return 0
+        
         try:
             # Find RunPeriod object
-            run_period_pattern = r'RunPeriod[^]*?End_Month[^\d]*(\d+)[^]*?End_Day[^\d]*(\d+)'
-            match = re.search(run_period_pattern, idf_content, re.MULTILINE | re.DOTALL)
+            match = RUN_PERIOD_END_PATTERN.search(idf_content)
             if match:
                 end_month = int(match.group(1))
                 end_day = int(match.group(2))
                 
                 # Also find begin month/day
-                begin_match = re.search(r'Begin_Month[^\d]*(\d+)[^]*?Begin_Day[^\d]*(\d+)', idf_content, re.MULTILINE | re.DOTALL)
+                begin_match = RUN_PERIOD_BEGIN_PATTERN.search(idf_content)
                 if begin_match:
                     begin_month = int(begin_match.group(1))
                     begin_day = int(begin_match.group(2))
@@ -185,7 +474,7 @@ class RobustEnergyPlusAPI:
                             end_date = datetime(2025, end_month, end_day)
                         days = (end_date - begin_date).days + 1
                         return days
-                    except:
+                    except ValueError:
                         # Fallback: estimate based on months
                         if end_month == begin_month:
                             return end_day - begin_day + 1
@@ -208,8 +497,7 @@ class RobustEnergyPlusAPI:
             #   ...
             
             # Use regex to find and modify RunPeriod
-            # Pattern: RunPeriod, followed by name, then begin/end month/day
-            run_period_pattern = r'(RunPeriod,\s*\n\s*[^,]+,\s*\n\s*)(\d+)(\s*,\s*!\s*-.*?\n\s*)(\d+)(\s*,\s*!\s*-.*?\n\s*)(\d+)(\s*,\s*!\s*-.*?\n\s*)(\d+)'
+            # Pattern: RunPeriod, followed by name, then begin/end month/day (RUN_PERIOD_COMMENTED_PATTERN)
             
             def replace_run_period(match):
                 name_part = match.group(1)
@@ -231,12 +519,14 @@ class RobustEnergyPlusAPI:
                     logger.info(f"   RunPeriod already short ({begin_month}/{begin_day} to {end_month}/{end_day}), keeping as is")
                     return match.group(0)
             
-            # Try to find and replace RunPeriod
-            modified_content = re.sub(run_period_pattern, replace_run_period, idf_content, flags=re.MULTILINE)
+            # Try to find and replace RunPeriod (both patterns need a literal "RunPeriod,")
+            has_run_period = 'RunPeriod,' in idf_content
+            modified_content = idf_content
+            if has_run_period:
+                modified_content = RUN_PERIOD_COMMENTED_PATTERN.sub(replace_run_period, idf_content)
             
             # Also try a simpler pattern for RunPeriod with different formatting
-            # Pattern: RunPeriod,\n  Name,\n  Begin_Month,\n  Begin_Day,\n  End_Month,\n  End_Day
-            simple_pattern = r'(RunPeriod,[^\n]*\n[^\n]*\n\s*)(\d+)(\s*,\s*[^\n]*\n\s*)(\d+)(\s*,\s*[^\n]*\n\s*)(\d+)(\s*,\s*[^\n]*\n\s*)(\d+)'
+            # Pattern: RunPeriod,\n  Name,\n  Begin_Month,\n  Begin_Day,\n  End_Month,\n  End_Day (RUN_PERIOD_SIMPLE_PATTERN)
             
             def replace_simple_run_period(match):
                 begin_month = int(match.group(2))
@@ -251,7 +541,8 @@ class RobustEnergyPlusAPI:
                     return f"{match.group(1)}1{match.group(3)}1{match.group(5)}1{match.group(7)}7"
                 return match.group(0)
             
-            modified_content = re.sub(simple_pattern, replace_simple_run_period, modified_content, flags=re.MULTILINE)
+            if has_run_period:
+                modified_content = RUN_PERIOD_SIMPLE_PATTERN.sub(replace_simple_run_period, modified_content)
             
             # Check if we actually modified anything
             if modified_content != idf_content:
@@ -259,8 +550,7 @@ class RobustEnergyPlusAPI:
                 return modified_content
             else:
                 # Try a more aggressive approach - look for any RunPeriod and modify it
-                # Just find the pattern "End_Month" followed by a number > 1
-                aggressive_pattern = r'(End_Month[^\d]*)(\d+)([^\d]*End_Day[^\d]*)(\d+)'
+                # Just find the pattern "End_Month" followed by a number > 1 (RUN_PERIOD_END_FIELDS_PATTERN)
                 
                 def replace_aggressive(match):
                     end_month = int(match.group(2))
@@ -270,7 +560,8 @@ class RobustEnergyPlusAPI:
                         return f"{match.group(1)}1{match.group(3)}7"
                     return match.group(0)
                 
-                modified_content = re.sub(aggressive_pattern, replace_aggressive, idf_content)
+                if 'End_Month' in idf_content:
+                    modified_content = RUN_PERIOD_END_FIELDS_PATTERN.sub(replace_aggressive, idf_content)
                 
                 if modified_content != idf_content:
                     logger.info("✅ IDF RunPeriod optimized (aggressive mode)")
@@ -283,58 +574,128 @@ class RobustEnergyPlusAPI:
             logger.warning(f"⚠️  Error optimizing IDF: {e}. Continuing with original IDF.")
             return idf_content
     
-    def read_request_simple(self, client_socket):
-        """Simple request reading with better handling and timeout"""
+    def read_request_simple(self, client_socket, read_body=True):
+        """Simple request reading with better handling and timeout (None if the request was already
+        answered - 408 timeout, 413 body or 431 headers too large; read_body=False stops after the headers)"""
         try:
-            # Set socket timeout to prevent hanging
-            client_socket.settimeout(30.0)  # 30 second timeout for reading
-            
-            request = b''
-            while True:
-                chunk = client_socket.recv(8192)
-                if not chunk:
+            header_deadline = time.monotonic() + REQUEST_HEADER_DEADLINE
+            
+            # Read straight into a preallocated bytearray with recv_into - no per-chunk bytes
+            # objects, and 64KB reads keep the syscall count low for multi-MB IDF uploads
+            request = bytearray(RECV_BUFFER_SIZE)
+            received = 0
+            header_end = -1
+            while header_end < 0:
+                if received == len(request):
+                    request.extend(bytes(RECV_BUFFER_SIZE))
+                received_now = self.recv_into_before(client_socket, memoryview(request)[received:], header_deadline)
+                if not received_now:
                     break
-                request += chunk
-                if b'\r\n\r\n' in request:
-                    header_end = request.find(b'\r\n\r\n')
-                    headers = request[:header_end].decode('utf-8')
+                # Only the newly received bytes (plus 3 for a split terminator) need searching
+                header_end = request.find(b'\r\n\r\n', max(0, received - 3), received + received_now)
+                received += received_now
+                if header_end < 0 and received >= MAX_HEADER_SIZE:
+                    logger.error(f"❌ Request headers larger than {MAX_HEADER_SIZE} bytes")
+                    self.send_error_response(client_socket, "Request headers too large",
+                                             status=b"431 Request Header Fields Too Large", drain=True)
+                    return None
+            
+            if header_end >= 0 and read_body:
+                # Look up Content-Length in the raw header bytes - no decode/split needed
+                length_match = CONTENT_LENGTH_HEADER_PATTERN.search(request, 0, header_end)
+                if length_match:
+                    content_length = int(length_match.group(1))
+                    # The buffer is sized from Content-Length, so refuse absurd values before allocating
+                    if content_length > self.max_request_size:
+                        error_msg = f"Request body too large: {content_length} bytes (limit {self.max_request_size})"
+                        logger.error(f"❌ {error_msg}")
+                        self.send_error_response(client_socket, error_msg, status=b"413 Payload Too Large", drain=True)
+                        return None
+                    expected_total = header_end + 4 + content_length
+                    body_deadline = time.monotonic() + REQUEST_BODY_DEADLINE + content_length / REQUEST_BODY_MIN_RATE
                     
-                    if 'Content-Length:' in headers:
-                        for line in headers.split('\r\n'):
-                            if line.startswith('Content-Length:'):
-                                content_length = int(line.split(':')[1].strip())
-                                body_start = header_end + 4
-                                expected_total = body_start + content_length
-                                
-                                # For very large requests, read in larger chunks
-                                chunk_size = 8192
-                                if content_length > 1000000:  # > 1MB
-                                    chunk_size = 32768  # 32KB chunks
-                                
-                                while len(request) < expected_total:
-                                    remaining = expected_total - len(request)
-                                    read_size = min(chunk_size, remaining)
-                                    chunk = client_socket.recv(read_size)
-                                    if not chunk:
-                                        break
-                                    request += chunk
+                    # Size the buffer for the whole body once, then fill it in place
+                    if expected_total > len(request):
+                        request.extend(bytes(expected_total - len(request)))
+                    with memoryview(request) as request_view:
+                        while received < expected_total:
+                            received_now = self.recv_into_before(client_socket, request_view[received:expected_total], body_deadline)
+                            if not received_now:
                                 break
-                    break
+                            received += received_now
+            
+            # Drop the unused tail of the preallocated buffer
+            del request[received:]
             
-            return request.decode('utf-8', errors='ignore')
+            # Raw bytes - callers decode only the header block; the JSON body goes to decode_json as-is
+            return request
             
         except socket.timeout:
+            # Tell a client that stalled (or is too slow for the deadline) why it's cut off - the
+            # caller then just closes the connection
             logger.error(f"❌ Request read timeout")
-            return ""
+            self.send_error_response(client_socket, "Request timeout", status=b"408 Request Timeout", drain=True)
+            return None
         except Exception as e:
             logger.error(f"❌ Error reading request: {e}")
-            return ""
+            return b""
     
-    def run_energyplus_simulation(self, idf_content, weather_content=None):
+    def recv_into_before(self, client_socket, buffer, deadline):
+        """recv_into that raises socket.timeout once the monotonic deadline has passed - each read
+        waits at most REQUEST_READ_TIMEOUT and never past the deadline"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise socket.timeout("request not received in time")
+        client_socket.settimeout(min(REQUEST_READ_TIMEOUT, remaining))
+        return client_socket.recv_into(buffer)
+    
+    def run_energyplus_simulation(self, idf_content, weather_content=None, base_url=None):
+        """Run EnergyPlus simulation, reusing the result of an identical earlier run when available
+        
+        base_url: download URL base for this request (defaults to BASE_URL / host:port)
+        """
+        # Key on both inputs - the settings that also shape the result are fixed for the process
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (idf_content, weather_content or ''):
+            digest.update(part.encode('utf-8', errors='ignore'))
+            digest.update(b'\0')
+        cache_key = digest.digest()
+        
+        with self.result_cache_lock:
+            cached_result = self.result_cache.get(cache_key)
+            if cached_result is not None:
+                # Download links are only valid while the stored output files are retained - downloads
+                # expire per file after the retention period, before the hourly cleanup removes them
+                available_until = cached_result.get('files_available_until')
+                if (available_until and datetime.fromisoformat(available_until) > datetime.now()
+                        and os.path.isdir(os.path.join(self.storage_dir, cached_result['simulation_id']))):
+                    self.result_cache.move_to_end(cache_key)
+                else:
+                    del self.result_cache[cache_key]
+                    cached_result = None
+        
+        if cached_result is not None:
+            logger.info(f"♻️  Reusing result of identical simulation {cached_result['simulation_id']}")
+            result = copy.deepcopy(cached_result)
+            result['processing_time'] = datetime.now().isoformat()
+            result['download_base_url'] = base_url or self.base_url or f"http://{self.host}:{self.port}"
+            return result
+        
+        result = self.execute_energyplus_simulation(idf_content, weather_content, base_url)
+        
+        if result.get('simulation_status') == 'success' and result.get('simulation_id'):
+            with self.result_cache_lock:
+                self.result_cache[cache_key] = copy.deepcopy(result)
+                if len(self.result_cache) > RESULT_CACHE_SIZE:
+                    self.result_cache.popitem(last=False)
+        return result
+    
+    def execute_energyplus_simulation(self, idf_content, weather_content=None, base_url=None):
         """Run actual EnergyPlus simulation"""
         try:
-            # Store IDF content for later analysis
-            self.current_idf_content = idf_content
+            # Keep the IDF as submitted for thermal analysis - it's passed down explicitly rather
+            # than stored on self, since concurrent requests share this instance
+            original_idf_content = idf_content
             
             logger.info("⚡ Starting REAL EnergyPlus simulation...")
             logger.info(f"📊 IDF size: {len(idf_content)} bytes")
@@ -343,9 +704,9 @@ class RobustEnergyPlusAPI:
             
             # OPTIMIZE FOR RAILWAY FREE TIER: Shorten simulation period if needed
             # Free tier has 60s timeout, so we run shorter periods (2 weeks) instead of full year
-            simulation_timeout = int(os.environ.get('SIMULATION_TIMEOUT', 55))
+            simulation_timeout = self.simulation_timeout
             # Allow disabling optimization via env var for testing
-            disable_optimization = os.environ.get('DISABLE_IDF_OPTIMIZATION', 'false').lower() == 'true'
+            disable_optimization = self.disable_idf_optimization
             optimize_for_free_tier = simulation_timeout <= 60 and not disable_optimization  # If timeout is 60s or less, optimize
             
             # Track simulation period for validation
@@ -373,12 +734,11 @@ class RobustEnergyPlusAPI:
                 if simulation_days > 0:
                     logger.info(f"   Simulation period: {simulation_days} days")
             
-            # Store simulation period for later validation
-            self.current_simulation_days = simulation_days
-            
             # Ensure Output:SQLite is in IDF - use 'Simple' for EnergyPlus 24.2.0 compatibility
             # EnergyPlus 24.2.0 may not support SimpleAndTabular, use Simple instead
-            if 'Output:SQLite' not in idf_content:
+            # Find the object once and edit it at that position rather than re-scanning the IDF with .sub()
+            sqlite_pos = idf_content.find('Output:SQLite')
+            if sqlite_pos < 0:
                 logger.warning("⚠️  Output:SQLite not found in IDF, adding it...")
                 # Add Output:SQLite - use Simple for better compatibility
                 idf_content += "\n\nOutput:SQLite,\n    Simple;        !- Option Type\n"
@@ -386,30 +746,25 @@ class RobustEnergyPlusAPI:
             else:
                 logger.info("✅ Output:SQLite found in IDF")
                 # Check if it has a valid option type
-                import re
-                sqlite_match = re.search(r'Output:SQLite,\s*\n\s*([^;!]+)', idf_content)
+                sqlite_match = SQLITE_OPTION_PATTERN.search(idf_content, sqlite_pos)
                 if sqlite_match:
                     option_type = sqlite_match.group(1).strip()
+                    # The option can only be rewritten when it directly ends the object (no comment before ';')
+                    option_terminated = idf_content.startswith(';', sqlite_match.end())
                     logger.info(f"   Current option type: '{option_type}'")
                     # Ensure it's Simple or SimpleAndTabular
                     if 'Simple' not in option_type and 'Tabular' not in option_type:
                         logger.warning(f"⚠️  Output:SQLite has unusual option type '{option_type}', changing to Simple...")
-                        idf_content = re.sub(
-                            r'Output:SQLite,\s*\n\s*[^;!]+;',
-                            'Output:SQLite,\n    Simple;        !- Option Type',
-                            idf_content
-                        )
-                        logger.info("✅ Updated Output:SQLite to use Simple option")
+                        if option_terminated:
+                            idf_content = idf_content[:sqlite_match.start()] + SQLITE_SIMPLE_OPTION + idf_content[sqlite_match.end() + 1:]
+                            logger.info("✅ Updated Output:SQLite to use Simple option")
                     elif 'SimpleAndTabular' in option_type:
                         # For EnergyPlus 24.2.0, SimpleAndTabular may not work - change to Simple
                         logger.warning(f"   ⚠️  Output:SQLite uses SimpleAndTabular, but EnergyPlus 24.2.0 may not support it")
                         logger.info(f"   Changing to 'Simple' for compatibility...")
-                        idf_content = re.sub(
-                            r'Output:SQLite,\s*\n\s*SimpleAndTabular;',
-                            'Output:SQLite,\n    Simple;        !- Option Type',
-                            idf_content
-                        )
-                        logger.info("✅ Changed Output:SQLite from SimpleAndTabular to Simple")
+                        if option_terminated and sqlite_match.group(1) == 'SimpleAndTabular':
+                            idf_content = idf_content[:sqlite_match.start()] + SQLITE_SIMPLE_OPTION + idf_content[sqlite_match.end() + 1:]
+                            logger.info("✅ Changed Output:SQLite from SimpleAndTabular to Simple")
                 else:
                     logger.warning("⚠️  Could not parse Output:SQLite option type")
             
@@ -423,7 +778,8 @@ class RobustEnergyPlusAPI:
                 
                 # Write weather file if provided
                 weather_path = None
-                if weather_content and weather_content.strip():
+                # isspace() stops at the first non-blank character instead of copying the EPW like strip()
+                if weather_content and not weather_content.isspace():
                     weather_path = os.path.join(temp_dir, 'weather.epw')
                     with open(weather_path, 'w', encoding='utf-8') as f:
                         f.write(weather_content)
@@ -446,25 +802,27 @@ class RobustEnergyPlusAPI:
                 ])
                 
                 logger.info(f"🔧 Running EnergyPlus command...")
-                logger.info(f"📋 Command: {' '.join(cmd)}")
+                logger.info("📋 Command: %s", ' '.join(cmd))
                 
                 # Run EnergyPlus with configurable timeout
                 # For Railway free tier: Use 55s timeout with optimized IDF (2 week simulation)
                 # For Railway Pro: Can use 180s+ with full year simulations
                 # Set SIMULATION_TIMEOUT env var (default: 55s for free tier compatibility, within 60s HTTP limit)
-                simulation_timeout = int(os.environ.get('SIMULATION_TIMEOUT', 55))
                 logger.info(f"⏱️  Simulation timeout set to: {simulation_timeout} seconds")
                 if simulation_timeout <= 60:
                     logger.info(f"   (Free tier mode: Using optimized 1-week simulation period)")
                 else:
                     logger.info(f"   (Pro tier mode: Full simulation, ensure Railway HTTP timeout >= {simulation_timeout}s)")
                 
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=simulation_timeout
-                )
+                # EnergyPlus runs in its own process, so concurrent requests already use separate
+                # cores - just keep the number of simultaneous runs within the core count
+                with self.simulation_slots:
+                    result = subprocess.run(
+                        cmd,
+                        capture_output=True,
+                        text=True,
+                        timeout=simulation_timeout
+                    )
                 
                 logger.info(f"📊 EnergyPlus exit code: {result.returncode}")
                 logger.info(f"📊 STDOUT length: {len(result.stdout)} chars")
@@ -472,13 +830,13 @@ class RobustEnergyPlusAPI:
                 
                 # Check output directory
                 output_files = os.listdir(output_dir)
-                logger.info(f"📁 Output files generated: {output_files}")
+                logger.info("📁 Output files generated: %s", output_files)
                 
                 # Check for SQLite files specifically - EnergyPlus generates eplusout.sql
                 sqlite_files = [f for f in output_files if (f.endswith('.sql') and ('eplusout' in f.lower() or 'sqlite' in f.lower())) 
                                 or 'sqlite' in f.lower() or f.endswith('.db')]
                 if sqlite_files:
-                    logger.info(f"✅ SQLite files found: {sqlite_files}")
+                    logger.info("✅ SQLite files found: %s", sqlite_files)
                     for sql_file in sqlite_files:
                         sql_path = os.path.join(output_dir, sql_file)
                         if os.path.exists(sql_path):
@@ -487,7 +845,7 @@ class RobustEnergyPlusAPI:
                 else:
                     logger.warning(f"⚠️  No SQLite files found in output directory")
                     logger.warning(f"   Expected: eplusout.sql (or similar)")
-                    logger.warning(f"   All output files: {output_files[:20]}")
+                    logger.warning("   All output files: %s", output_files[:20])
                     
                     # Check error file for SQLite warnings
                     err_files = [f for f in output_files if f.endswith('.err')]
@@ -519,12 +877,13 @@ class RobustEnergyPlusAPI:
                 
                 # Parse results - even if exit code != 0, we might have partial results
                 if output_files:
-                    parsed_response = self.parse_energyplus_output(output_dir, result.returncode, result.stderr)
+                    parsed_response = self.parse_energyplus_output(output_dir, result.returncode, result.stderr,
+                                                                   simulation_days, original_idf_content)
                     # Add file URLs to response
                     parsed_response['simulation_id'] = simulation_id
                     parsed_response['output_files_download'] = file_urls
                     parsed_response['files_available_until'] = (datetime.now() + timedelta(hours=self.file_retention_hours)).isoformat()
-                    parsed_response['download_base_url'] = self.base_url or f"http://{self.host}:{self.port}"
+                    parsed_response['download_base_url'] = base_url or self.base_url or f"http://{self.host}:{self.port}"
                     return parsed_response
                 else:
                     error_msg = f"EnergyPlus generated no output files. Exit code: {result.returncode}"
@@ -535,8 +894,7 @@ class RobustEnergyPlusAPI:
                     return self.create_error_response(error_msg)
                     
         except subprocess.TimeoutExpired:
-            timeout_seconds = int(os.environ.get('SIMULATION_TIMEOUT', 55))
-            error_msg = f"EnergyPlus simulation timed out ({timeout_seconds} seconds). The IDF was automatically optimized for fast simulation, but still timed out. Solutions: (1) Further simplify the IDF model, (2) Increase SIMULATION_TIMEOUT env var if on Railway Pro, (3) Check if IDF has complex HVAC systems that can be simplified."
+            error_msg = f"EnergyPlus simulation timed out ({self.simulation_timeout} seconds). The IDF was automatically optimized for fast simulation, but still timed out. Solutions: (1) Further simplify the IDF model, (2) Increase SIMULATION_TIMEOUT env var if on Railway Pro, (3) Check if IDF has complex HVAC systems that can be simplified."
             logger.error(f"❌ {error_msg}")
             return self.create_error_response(error_msg)
         except Exception as e:
@@ -544,13 +902,13 @@ class RobustEnergyPlusAPI:
             logger.error(f"❌ {error_msg}")
             return self.create_error_response(error_msg)
     
-    def parse_energyplus_output(self, output_dir, exit_code, stderr):
+    def parse_energyplus_output(self, output_dir, exit_code, stderr, simulation_days=365, idf_content=None):
         """Parse EnergyPlus output files - ESO, MTR, ERR, etc."""
         try:
             logger.info("📊 Parsing EnergyPlus output (ROBUST VERSION)...")
             
             output_files = os.listdir(output_dir)
-            logger.info(f"📁 Files to parse: {output_files}")
+            logger.info("📁 Files to parse: %s", output_files)
             
             # Parse ERR file first to check for errors
             # EnergyPlus generates eplusout.err as the main error file
@@ -577,23 +935,20 @@ class RobustEnergyPlusAPI:
             if err_file:
                 with open(err_file, 'r') as f:
                     err_content = f.read()
-                logger.info(f"📊 Error file content ({len(err_content)} chars):")
-                logger.info(err_content[:1000])  # First 1000 chars
+                logger.info(f"📊 Error file content ({len(err_content)} chars)")
+                logger.debug("%s", err_content[:1000])  # First 1000 chars
                 
-                # Check for fatal errors
-                if '** Fatal' in err_content:
+                # Check for fatal errors and warnings in a single pass over the lines
+                has_fatal = '** Fatal' in err_content
+                if has_fatal or '** Warning' in err_content or '** Severe' in err_content:
                     for line in err_content.split('\n'):
-                        if '** Fatal' in line or '**  Fatal' in line:
+                        if has_fatal and ('** Fatal' in line or '**  Fatal' in line):
                             fatal_errors.append(line.strip())
-                
-                # Check for warnings
-                if '** Warning' in err_content or '** Severe' in err_content:
-                    for line in err_content.split('\n'):
                         if '** Warning' in line or '** Severe' in line:
                             warnings.append(line.strip())
             
             # Collect output info even if there are errors (for debugging)
-            output_info = self.collect_output_info(output_dir, err_file)
+            output_info = self.collect_output_info(output_dir, err_file, err_content)
             
             # If fatal errors, return error response with details
             if fatal_errors:
@@ -604,9 +959,7 @@ class RobustEnergyPlusAPI:
                 return error_response
             
             # Check if extraction should be skipped (for local extraction workflow)
-            skip_extraction = os.environ.get('SKIP_ENERGY_EXTRACTION', 'false').lower() == 'true'
-            
-            if skip_extraction:
+            if self.skip_energy_extraction:
                 logger.info("⚡ Skipping energy extraction (SKIP_ENERGY_EXTRACTION=true)")
                 logger.info("   Returning raw output files for local extraction")
                 
@@ -636,7 +989,7 @@ class RobustEnergyPlusAPI:
                 return response
             
             # Parse output data (normal flow)
-            energy_data = self.parse_all_output_files(output_dir)
+            energy_data = self.parse_all_output_files(output_dir, simulation_days)
             
             # If no energy data found, explain why
             if not energy_data or energy_data.get('total_energy_consumption', 0) == 0:
@@ -653,11 +1006,10 @@ class RobustEnergyPlusAPI:
                 return error_response
             
             # Calculate additional metrics
-            self.add_calculated_metrics(energy_data)
+            self.add_calculated_metrics(energy_data, idf_content)
             
             # Annualize energy values if simulation period is less than 365 days
             # This ensures EUI and total energy are reported as annual values
-            simulation_days = getattr(self, 'current_simulation_days', 365)
             if simulation_days > 0 and simulation_days < 365:
                 annualization_factor = 365.0 / simulation_days
                 logger.info(f"📅 Annualizing energy values for response (factor: {annualization_factor:.2f}x, period: {simulation_days} days)")
@@ -668,14 +1020,7 @@ class RobustEnergyPlusAPI:
                 building_area = energy_data.get('building_area', 0)
                 
                 # Calculate breakdown sum to check consistency
-                breakdown_sum = sum([
-                    energy_data.get('heating_energy', 0),
-                    energy_data.get('cooling_energy', 0),
-                    energy_data.get('lighting_energy', 0),
-                    energy_data.get('equipment_energy', 0),
-                    energy_data.get('fans_energy', 0),
-                    energy_data.get('pumps_energy', 0)
-                ])
+                breakdown_sum = self.breakdown_total(energy_data)
                 
                 # If breakdown sum is reasonable for weekly but total_energy is way higher,
                 # total_energy might already be annual - recalculate from breakdown
@@ -696,7 +1041,7 @@ class RobustEnergyPlusAPI:
                             logger.info(f"   Total energy: {original:.2f} → {energy_data['total_energy_consumption']:.2f} kWh")
                 
                 # Always annualize breakdown values (they should be weekly)
-                for key in ['heating_energy', 'cooling_energy', 'lighting_energy', 'equipment_energy', 'fans_energy', 'pumps_energy']:
+                for key in BREAKDOWN_FIELDS:
                     if key in energy_data and energy_data[key] > 0:
                         original = energy_data[key]
                         energy_data[key] = round(original * annualization_factor, 2)
@@ -709,7 +1054,7 @@ class RobustEnergyPlusAPI:
             
             # Calculate additional metrics AFTER annualization
             # This ensures EUI uses annualized energy values
-            self.add_calculated_metrics(energy_data)
+            self.add_calculated_metrics(energy_data, idf_content)
             
             # Build successful response
             response = {
@@ -773,91 +1118,32 @@ class RobustEnergyPlusAPI:
             logger.error(f"❌ {error_msg}")
             return self.create_error_response(error_msg)
     
-    def parse_all_output_files(self, output_dir):
+    def parse_all_output_files(self, output_dir, simulation_days=7):
         """Parse all output files - HTML first (most reliable), then MTR, CSV, ESO, SQLite"""
         energy_data = {}
         extraction_method = "standard"  # Track which method was used
         
         output_files = os.listdir(output_dir)
-        logger.info(f"📁 Output files: {output_files}")
+        logger.info("📁 Output files: %s", output_files)
         
-        # Try HTML summary FIRST - it has the most complete and reliable data
+        # The HTML, MTR, CSV and SQLite parsers don't depend on each other - start them all
+        # concurrently, then merge their results below in the original priority order
+        html_jobs = []
+        mtr_jobs = []
+        csv_jobs = []
         for file in output_files:
             if file.endswith('Table.html') or file.endswith('tbl.htm') or file.endswith('tbl.html') or file.endswith('.html') or file.endswith('.htm'):
-                html_path = os.path.join(output_dir, file)
                 logger.info(f"📊 Parsing HTML: {file}")
-                data = self.parse_energyplus_html(html_path)
-                if data:
-                    # HTML data takes priority - don't let other parsers overwrite it
-                    for key, value in data.items():
-                        if key not in energy_data or value > 0:  # Only update if we don't have data or new data is non-zero
-                            energy_data[key] = value
-                    logger.info(f"✅ Got data from {file}: {list(data.keys())}")
-        
-        # FIX 1: Always try MTR files for breakdown, even if HTML provided total
-        # HTML might have total but incomplete/zero breakdown for large buildings
-        for file in output_files:
+                html_jobs.append((file, self.output_parser_pool.submit(self.parse_energyplus_html, os.path.join(output_dir, file))))
             if file.endswith('.mtr'):
-                mtr_path = os.path.join(output_dir, file)
                 logger.info(f"📊 Parsing MTR for breakdown: {file}")
-                data = self.parse_energyplus_mtr(mtr_path)
-                if data:
-                    # Always update breakdown fields if MTR has better data
-                    breakdown_fields = ['heating_energy', 'cooling_energy', 'lighting_energy', 
-                                       'equipment_energy', 'fans_energy', 'pumps_energy']
-                    for field in breakdown_fields:
-                        if field in data and data[field] > 0:
-                            current_value = energy_data.get(field, 0)
-                            if data[field] > current_value:  # Use larger value (more complete)
-                                energy_data[field] = data[field]
-                                logger.info(f"   Updated {field}: {data[field]:.2f} kWh")
-                    
-                    # Update total if facility-level total is larger (more reliable)
-                    if 'total_energy_consumption' in data:
-                        facility_total = data['total_energy_consumption']
-                        current_total = energy_data.get('total_energy_consumption', 0)
-                        if facility_total > current_total * 1.1:  # Only if significantly larger (10% threshold)
-                            energy_data['total_energy_consumption'] = facility_total
-                            logger.info(f"✅ Updated total from facility-level meter: {facility_total:.2f} kWh (was {current_total:.2f} kWh)")
-                        elif facility_total > 0 and current_total == 0:
-                            energy_data['total_energy_consumption'] = facility_total
-                            logger.info(f"✅ Set total from facility-level meter: {facility_total:.2f} kWh")
-                    
-                    logger.info(f"✅ MTR data merged: breakdown updated, total may be updated")
-        
-        # Try CSV files - as fallback for energy, but always try for building area
-        for file in output_files:
+                mtr_jobs.append((file, self.output_parser_pool.submit(self.parse_energyplus_mtr, os.path.join(output_dir, file))))
             if file.endswith('Meter.csv') or file.endswith('Table.csv') or file.endswith('.csv'):
-                csv_path = os.path.join(output_dir, file)
                 logger.info(f"📊 Parsing CSV: {file}")
-                data = self.parse_energyplus_csv(csv_path)
-                if data:
-                    # Always update building_area from CSV if found (most reliable source)
-                    if 'building_area' in data and data['building_area'] > 0:
-                        energy_data['building_area'] = data['building_area']
-                        logger.info(f"✅ Updated building area from CSV: {data['building_area']:.2f} m²")
-                    # Only update energy if we don't have it yet
-                    if energy_data.get('total_energy_consumption', 0) == 0:
-                        energy_data.update(data)
-                        logger.info(f"✅ Got energy data from {file}: {list(data.keys())}")
-        
-        # Try ESO file (EnergyPlus Standard Output) - before SQLite
-        if energy_data.get('total_energy_consumption', 0) == 0:
-            for file in output_files:
-                if file.endswith('.eso'):
-                    eso_path = os.path.join(output_dir, file)
-                    logger.info(f"📊 Parsing ESO: {file}")
-                    data = self.parse_energyplus_eso(eso_path)
-                    if data:
-                        energy_data.update(data)
-                        logger.info(f"✅ Got data from {file}: {list(data.keys())}")
-        
-        # FIX: Always check SQLite for facility-level meters (most reliable source)
-        # Even if HTML/CSV provided a total, SQLite may have the complete facility-level meters
-        # EnergyPlus generates SQLite as eplusout.sql (not .sqlite extension)
-        current_total = energy_data.get('total_energy_consumption', 0)
+                csv_jobs.append((file, self.output_parser_pool.submit(self.parse_energyplus_csv, os.path.join(output_dir, file))))
         
         # Look for SQLite files - check for .sql files first (most common)
+        # EnergyPlus generates SQLite as eplusout.sql (not .sqlite extension)
         sqlite_files_found = []
         for file in output_files:
             if (file.endswith('.sqlite') or file.endswith('.sqlite3') or file.endswith('.db') or 
@@ -865,8 +1151,10 @@ class RobustEnergyPlusAPI:
                 sqlite_files_found.append(file)
         
         if sqlite_files_found:
-            logger.info(f"📊 Found {len(sqlite_files_found)} SQLite file(s): {sqlite_files_found}")
+            logger.info("📊 Found %d SQLite file(s): %s", len(sqlite_files_found), sqlite_files_found)
         
+        # Only the first SQLite file that exists is used
+        sqlite_job = None
         for file in sqlite_files_found:
             sqlite_path = os.path.join(output_dir, file)
             logger.info(f"📊 Parsing SQLite for facility-level meters: {file}")
@@ -879,7 +1167,76 @@ class RobustEnergyPlusAPI:
             file_size = os.path.getsize(sqlite_path)
             logger.info(f"   File size: {file_size:,} bytes")
             
-            sqlite_data = self.extract_energy_from_sqlite(sqlite_path)
+            sqlite_job = (file, self.output_parser_pool.submit(self.extract_energy_from_sqlite, sqlite_path, simulation_days))
+            break
+        
+        # Try HTML summary FIRST - it has the most complete and reliable data
+        for file, html_job in html_jobs:
+            data = html_job.result()
+            if data:
+                # HTML data takes priority - don't let other parsers overwrite it
+                for key, value in data.items():
+                    if key not in energy_data or value > 0:  # Only update if we don't have data or new data is non-zero
+                        energy_data[key] = value
+                logger.info(f"✅ Got data from {file}: {list(data.keys())}")
+        
+        # FIX 1: Always try MTR files for breakdown, even if HTML provided total
+        # HTML might have total but incomplete/zero breakdown for large buildings
+        for file, mtr_job in mtr_jobs:
+            data = mtr_job.result()
+            if data:
+                # Always update breakdown fields if MTR has better data
+                for field in BREAKDOWN_FIELDS:
+                    if field in data and data[field] > 0:
+                        current_value = energy_data.get(field, 0)
+                        if data[field] > current_value:  # Use larger value (more complete)
+                            energy_data[field] = data[field]
+                            logger.info(f"   Updated {field}: {data[field]:.2f} kWh")
+                
+                # Update total if facility-level total is larger (more reliable)
+                if 'total_energy_consumption' in data:
+                    facility_total = data['total_energy_consumption']
+                    current_total = energy_data.get('total_energy_consumption', 0)
+                    if facility_total > current_total * 1.1:  # Only if significantly larger (10% threshold)
+                        energy_data['total_energy_consumption'] = facility_total
+                        logger.info(f"✅ Updated total from facility-level meter: {facility_total:.2f} kWh (was {current_total:.2f} kWh)")
+                    elif facility_total > 0 and current_total == 0:
+                        energy_data['total_energy_consumption'] = facility_total
+                        logger.info(f"✅ Set total from facility-level meter: {facility_total:.2f} kWh")
+                
+                logger.info(f"✅ MTR data merged: breakdown updated, total may be updated")
+        
+        # Try CSV files - as fallback for energy, but always try for building area
+        for file, csv_job in csv_jobs:
+            data = csv_job.result()
+            if data:
+                # Always update building_area from CSV if found (most reliable source)
+                if 'building_area' in data and data['building_area'] > 0:
+                    energy_data['building_area'] = data['building_area']
+                    logger.info(f"✅ Updated building area from CSV: {data['building_area']:.2f} m²")
+                # Only update energy if we don't have it yet
+                if energy_data.get('total_energy_consumption', 0) == 0:
+                    energy_data.update(data)
+                    logger.info(f"✅ Got energy data from {file}: {list(data.keys())}")
+        
+        # Try ESO file (EnergyPlus Standard Output) - before SQLite
+        if energy_data.get('total_energy_consumption', 0) == 0:
+            for file in output_files:
+                if file.endswith('.eso'):
+                    eso_path = os.path.join(output_dir, file)
+                    logger.info(f"📊 Parsing ESO: {file}")
+                    data = self.parse_energyplus_eso(eso_path)
+                    if data:
+                        energy_data.update(data)
+                        logger.info(f"✅ Got data from {file}: {list(data.keys())}")
+        
+        # FIX: Always check SQLite for facility-level meters (most reliable source)
+        # Even if HTML/CSV provided a total, SQLite may have the complete facility-level meters
+        current_total = energy_data.get('total_energy_consumption', 0)
+        
+        if sqlite_job is not None:
+            file, sqlite_future = sqlite_job
+            sqlite_data = sqlite_future.result()
             if sqlite_data and sqlite_data.get('total_energy_consumption', 0) > 0:
                 sqlite_total = sqlite_data.get('total_energy_consumption', 0)
                 
@@ -922,13 +1279,10 @@ class RobustEnergyPlusAPI:
                     # Still merge breakdown if SQLite has better breakdown
                     logger.info(f"📊 SQLite total ({sqlite_total:.2f} kWh) similar to current ({current_total:.2f} kWh)")
                     logger.info(f"   Merging SQLite breakdown data if available")
-                    breakdown_fields = ['heating_energy', 'cooling_energy', 'lighting_energy', 
-                                      'equipment_energy', 'fans_energy', 'pumps_energy']
-                    for field in breakdown_fields:
+                    for field in BREAKDOWN_FIELDS:
                         if field in sqlite_data and sqlite_data[field] > energy_data.get(field, 0):
                             energy_data[field] = sqlite_data[field]
                             logger.info(f"   Updated {field} from SQLite: {sqlite_data[field]:.2f} kWh")
-            break  # Stop after first SQLite file
         
         # Store extraction method for reporting
         energy_data['_extraction_method'] = extraction_method
@@ -966,7 +1320,7 @@ class RobustEnergyPlusAPI:
                             # parts[2] is the meter name like "Electricity:Facility [J] !Hourly"
                             meter_name = parts[2].split('[')[0].strip().lower()
                             meter_dict[meter_id] = meter_name
-                            logger.info(f"   Found meter {meter_id}: {meter_name}")
+                            logger.debug("   Found meter %s: %s", meter_id, meter_name)
                     except (ValueError, IndexError):
                         continue
             
@@ -993,11 +1347,11 @@ class RobustEnergyPlusAPI:
                     except (ValueError, IndexError):
                         continue
             
-            logger.info(f"📊 Meter totals:")
-            for meter, total in meter_totals.items():
-                # Convert J to kWh
-                total_kwh = total * 2.77778e-7
-                logger.info(f"   {meter}: {total_kwh:.2f} kWh")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📊 Meter totals:")
+                for meter, total in meter_totals.items():
+                    # Convert J to kWh
+                    logger.debug("   %s: %.2f kWh", meter, total / J_PER_KWH)
             
             # Step 3: Categorize and convert to kWh
             # FIX 2: Prioritize facility-level meters over breakdown
@@ -1013,7 +1367,7 @@ class RobustEnergyPlusAPI:
             
             for meter_name, value_j in meter_totals.items():
                 # Convert J to kWh
-                value = value_j * 2.77778e-7
+                value = value_j / J_PER_KWH
                 
                 # Categorize based on meter name
                 if 'heating:electricity' in meter_name or 'heating:naturalgas' in meter_name:
@@ -1094,6 +1448,13 @@ class RobustEnergyPlusAPI:
             logger.error(traceback.format_exc())
             return {}
     
+    def csv_numeric_values(self, parts):
+        """Yield the float value of each numeric CSV field, skipping non-numeric ones"""
+        for part in parts:
+            part = part.strip()
+            if NUMERIC_FIELD_PATTERN.fullmatch(part):
+                yield float(part)
+    
     def parse_energyplus_csv(self, csv_path):
         """Parse EnergyPlus CSV files - Enhanced to extract building area"""
         try:
@@ -1122,32 +1483,24 @@ class RobustEnergyPlusAPI:
                 # Priority 1: Look for "Total Building Area" in same line (format: ",Total Building Area,472.78,")
                 # Make sure it's the main one (not a zone or sub-area)
                 if 'total building area' in line_lower and 'zone' not in line_lower and 'space' not in line_lower:
-                    for part in parts:
-                        try:
-                            area = float(part.strip())
-                            if 50 < area < 50000:  # Reasonable building area range (m²)
-                                # Only use if we don't have one yet, or if this is larger (main building area)
-                                current_area = energy_data.get('building_area', 0)
-                                if current_area == 0 or area > current_area:
-                                    building_area = area
-                                    energy_data['building_area'] = round(area, 2)
-                                    logger.info(f"✅ Building area from CSV (Total Building Area): {area:.2f} m²")
-                                    break
-                        except (ValueError, AttributeError):
-                            continue
-                
-                # Priority 2: Look for "Net Conditioned Building Area" (same as total if not already found)
-                if 'net conditioned building area' in line_lower and energy_data.get('building_area', 0) == 0:
-                    for part in parts:
-                        try:
-                            area = float(part.strip())
-                            if 50 < area < 50000:
+                    for area in self.csv_numeric_values(parts):
+                        if 50 < area < 50000:  # Reasonable building area range (m²)
+                            # Only use if we don't have one yet, or if this is larger (main building area)
+                            current_area = energy_data.get('building_area', 0)
+                            if current_area == 0 or area > current_area:
                                 building_area = area
                                 energy_data['building_area'] = round(area, 2)
-                                logger.info(f"✅ Building area from CSV (Net Conditioned): {area:.2f} m²")
+                                logger.info(f"✅ Building area from CSV (Total Building Area): {area:.2f} m²")
                                 break
-                        except (ValueError, AttributeError):
-                            continue
+                
+                # Priority 2: Look for "Net Conditioned Building Area" (same as total if not already found)
+                if 'net conditioned building area' in line_lower and energy_data.get('building_area', 0) == 0:
+                    for area in self.csv_numeric_values(parts):
+                        if 50 < area < 50000:
+                            building_area = area
+                            energy_data['building_area'] = round(area, 2)
+                            logger.info(f"✅ Building area from CSV (Net Conditioned): {area:.2f} m²")
+                            break
                 
                 # Priority 3: Check for building area header (format: ",,Area [m2],...")
                 # Only if we haven't found it yet
@@ -1158,37 +1511,31 @@ class RobustEnergyPlusAPI:
                         # Check if next line contains "Total Building Area" 
                         if 'total building area' in next_line.lower():
                             next_parts = next_line.split(',')
-                            for part in next_parts:
-                                try:
-                                    area = float(part.strip())
-                                    if 50 < area < 50000:
-                                        building_area = area
-                                        energy_data['building_area'] = round(area, 2)
-                                        logger.info(f"✅ Building area from CSV (header + Total Building Area): {area:.2f} m²")
-                                        break
-                                except (ValueError, AttributeError):
-                                    continue
+                            for area in self.csv_numeric_values(next_parts):
+                                if 50 < area < 50000:
+                                    building_area = area
+                                    energy_data['building_area'] = round(area, 2)
+                                    logger.info(f"✅ Building area from CSV (header + Total Building Area): {area:.2f} m²")
+                                    break
                 
                 # Look for energy values
                 if any(keyword in line_lower for keyword in ['electricity', 'gas', 'energy']):
                     parts = [p.strip() for p in line.split(',')]
-                    if len(parts) >= 2:
-                        try:
-                            value = float(parts[-1])  # Last column is usually the value
-                            if value > 0:
-                                total += value
-                                
-                                # Categorize
-                                if 'heat' in line_lower:
-                                    heating += value
-                                elif 'cool' in line_lower:
-                                    cooling += value
-                                elif 'light' in line_lower:
-                                    lighting += value
-                                elif 'equipment' in line_lower or 'plug' in line_lower:
-                                    equipment += value
-                        except:
-                            pass
+                    # Last column is usually the value
+                    if len(parts) >= 2 and NUMERIC_FIELD_PATTERN.fullmatch(parts[-1]):
+                        value = float(parts[-1])
+                        if value > 0:
+                            total += value
+                            
+                            # Categorize
+                            if 'heat' in line_lower:
+                                heating += value
+                            elif 'cool' in line_lower:
+                                cooling += value
+                            elif 'light' in line_lower:
+                                lighting += value
+                            elif 'equipment' in line_lower or 'plug' in line_lower:
+                                equipment += value
             
             if total > 0:
                 energy_data['total_energy_consumption'] = round(total, 2)
@@ -1206,29 +1553,32 @@ class RobustEnergyPlusAPI:
     def parse_energyplus_html(self, html_path):
         """Parse EnergyPlus HTML summary - Enhanced to extract End Uses table"""
         try:
-            with open(html_path, 'r') as f:
+            with open(html_path, 'rb') as f:
                 content = f.read()
             
-            logger.info(f"📊 HTML content: {len(content)} chars")
+            logger.info(f"📊 HTML content: {len(content)} bytes")
             
             energy_data = {}
             
             # Extract building area first
-            area_patterns = [
-                r'Net\s+Conditioned\s+Building\s+Area</td>\s*<td[^>]*>\s*([\d.]+)',
-                r'Total\s+Building\s+Area</td>\s*<td[^>]*>\s*([\d.]+)',
-                r'Total\s+Floor\s+Area</td>\s*<td[^>]*>\s*([\d.]+)',
-            ]
+            # One pass over the HTML keeps the first value for each label, then the
+            # labels are tried in priority order (Net Conditioned > Total Building > Total Floor)
+            area_values = [None, None, None]
+            for match in HTML_AREA_PATTERN.finditer(content):
+                priority = 0 if match.group(1) else 1 if match.group(2) else 2
+                if area_values[priority] is None:
+                    area_values[priority] = match.group(4)
+                    if None not in area_values:
+                        break
             
-            for pattern in area_patterns:
-                match = re.search(pattern, content, re.IGNORECASE)
-                if match:
+            for area_value in area_values:
+                if area_value is not None:
                     try:
-                        area = float(match.group(1))
+                        area = float(area_value)
                         energy_data['building_area'] = round(area, 2)
                         logger.info(f"✅ Building area found: {area:.2f} m²")
                         break
-                    except:
+                    except ValueError:
                         pass
             
             # Extract End Uses table data
@@ -1237,7 +1587,7 @@ class RobustEnergyPlusAPI:
             
             # Find the ANNUAL End Uses table (not the Demand End Uses table)
             # Look for the Annual Building Utility Performance Summary table
-            end_uses_match = re.search(r'Annual Building Utility Performance Summary.*?<b>End Uses</b>.*?<table[^>]*>(.*?)</table>', content, re.DOTALL | re.IGNORECASE)
+            end_uses_match = HTML_END_USES_TABLE_PATTERN.search(content)
             
             if end_uses_match:
                 table_content = end_uses_match.group(1)
@@ -1245,39 +1595,28 @@ class RobustEnergyPlusAPI:
                 
                 # Extract energy by category
                 # Pattern: <td align="right">Category</td> followed by energy values
-                categories = {
-                    'Heating': 0,
-                    'Cooling': 0,
-                    'Interior Lighting': 0,
-                    'Interior Equipment': 0,
-                    'Exterior Equipment': 0,
-                    'Fans': 0,
-                    'Pumps': 0,
-                    'Heat Rejection': 0,
-                    'Humidification': 0,
-                    'Heat Recovery': 0,
-                    'Water Systems': 0,
-                    'Refrigeration': 0,
-                    'Exterior Lighting': 0,
-                }
+                categories = dict.fromkeys(END_USE_CATEGORIES, 0)
+                
+                # Index the table rows by label in one pass instead of searching the table per category
+                # Pattern: <tr><td>Category</td><td>Electricity[GJ]</td><td>NaturalGas[GJ]</td>...
+                end_use_rows = {}
+                for row_match in END_USES_ROW_PATTERN.finditer(table_content):
+                    end_use_rows.setdefault(row_match.group(1).decode('utf-8', 'replace').lower(), row_match.group(2))
                 
                 for category in categories.keys():
                     # Find the row for this category
-                    # Pattern: <tr><td>Category</td><td>Electricity[GJ]</td><td>NaturalGas[GJ]</td>...
-                    category_pattern = rf'<td[^>]*>{category}</td>(.*?)</tr>'
-                    category_match = re.search(category_pattern, table_content, re.DOTALL | re.IGNORECASE)
+                    row_content = end_use_rows.get(category.lower())
                     
-                    if category_match:
-                        row_content = category_match.group(1)
+                    if row_content is not None:
                         # Extract all numeric values from this row (they're in GJ)
-                        values = re.findall(r'<td[^>]*>\s*([\d.]+)\s*</td>', row_content)
+                        values = HTML_NUMERIC_CELL_PATTERN.findall(row_content)
                         
                         # Sum all fuel types for this category
-                        total_gj = sum(float(v) for v in values if v != '0.00')
-                        categories[category] = total_gj * 277.778  # Convert GJ to kWh
+                        total_gj = sum(float(v) for v in values if v != b'0.00')
+                        categories[category] = total_gj * KWH_PER_GJ  # Convert GJ to kWh
                         
                         if total_gj > 0:
-                            logger.info(f"   {category}: {total_gj:.2f} GJ = {categories[category]:.2f} kWh")
+                            logger.debug("   %s: %.2f GJ = %.2f kWh", category, total_gj, categories[category])
                 
                 # Map to our energy data structure (MAIN 6 CATEGORIES - no double counting)
                 energy_data['heating_energy'] = round(categories.get('Heating', 0), 2)
@@ -1302,20 +1641,19 @@ class RobustEnergyPlusAPI:
                     energy_data['refrigeration_energy'] = round(categories.get('Refrigeration', 0), 2)
                 
                 # Get total from "Total End Uses" row (EnergyPlus already calculated it correctly)
-                total_end_uses_pattern = r'<td[^>]*>Total End Uses</td>(.*?)</tr>'
-                total_match = re.search(total_end_uses_pattern, table_content, re.DOTALL | re.IGNORECASE)
+                total_row_content = end_use_rows.get('total end uses')
                 
                 total = 0
-                if total_match:
-                    row_content = total_match.group(1)
+                if total_row_content is not None:
+                    row_content = total_row_content
                     # Extract all numeric values (they're in GJ, excluding the last column which is Water in m³)
-                    values = re.findall(r'<td[^>]*>\s*([\d.]+)\s*</td>', row_content)
+                    values = HTML_NUMERIC_CELL_PATTERN.findall(row_content)
                     
                     # Sum all energy values (not water) - typically first 13 columns
                     # Last column is Water [m³], not energy
-                    energy_values_gj = [float(v) for v in values[:-1] if v != '0.00']
+                    energy_values_gj = [float(v) for v in values[:-1] if v != b'0.00']
                     total_gj = sum(energy_values_gj)
-                    total = total_gj * 277.778  # Convert to kWh
+                    total = total_gj * KWH_PER_GJ  # Convert to kWh
                     
                     logger.info(f"✅ Total from 'Total End Uses' row: {total_gj:.2f} GJ = {total:.2f} kWh")
                 else:
@@ -1354,22 +1692,31 @@ class RobustEnergyPlusAPI:
     def parse_energyplus_eso(self, eso_path):
         """Parse EnergyPlus ESO file (most reliable source)"""
         try:
-            with open(eso_path, 'r') as f:
-                content = f.read()
-            
-            logger.info(f"📊 ESO content: {len(content)} chars")
-            logger.info(f"📊 First 1000 chars:\n{content[:1000]}")
-            
-            # ESO files have a data dictionary and values
-            # This is complex - for now, just check if it has data
-            lines = content.split('\n')
-            data_lines = [l for l in lines if l.strip() and not l.startswith('!') and ',' in l]
+            # ESO files can be hundreds of MB for hourly output - map the file and
+            # stream over its lines instead of reading it into one string
+            with open(eso_path, 'rb') as f:
+                eso_size = os.fstat(f.fileno()).st_size
+                if eso_size == 0:
+                    logger.info("📊 ESO file is empty")
+                    return {}
+                
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as eso_map:
+                    logger.info(f"📊 ESO content: {eso_size} bytes")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("📊 First 1000 chars:\n%s", eso_map[:1000].decode('utf-8', errors='ignore'))
+                    
+                    # ESO files have a data dictionary and values
+                    # This is complex - for now, just check if it has data
+                    data_lines = 0
+                    for line in iter(eso_map.readline, b''):
+                        if line.strip() and not line.startswith(b'!') and b',' in line:
+                            data_lines += 1
             
-            logger.info(f"📊 ESO data lines: {len(data_lines)}")
+            logger.info(f"📊 ESO data lines: {data_lines}")
             
             # If we have data, indicate simulation ran
-            if len(data_lines) > 10:
-                return {'eso_data_lines': len(data_lines)}
+            if data_lines > 10:
+                return {'eso_data_lines': data_lines}
             
             return {}
             
@@ -1377,7 +1724,11 @@ class RobustEnergyPlusAPI:
             logger.error(f"❌ ESO parse error: {e}")
             return {}
     
-    def extract_energy_from_sqlite(self, sqlite_path):
+    def meter_value_kwh(self, value, units):
+        """Convert a SQLite meter/report value to kWh from its units (J when unknown)"""
+        return value * KWH_PER_UNIT.get(units.upper() if units else 'J', KWH_PER_UNIT['J'])
+    
+    def extract_energy_from_sqlite(self, sqlite_path, simulation_days=7):
         """
         Extract energy consumption data from EnergyPlus SQLite database using multiple query strategies.
         
@@ -1408,11 +1759,11 @@ class RobustEnergyPlusAPI:
                 # Check schema of both tables
                 cursor.execute("PRAGMA table_info(ReportMeterData)")
                 meter_columns = [row[1] for row in cursor.fetchall()]
-                logger.info(f"📊 ReportMeterData columns: {meter_columns}")
+                logger.info("📊 ReportMeterData columns: %s", meter_columns)
                 
                 cursor.execute("PRAGMA table_info(ReportMeterDataDictionary)")
                 dict_columns = [row[1] for row in cursor.fetchall()]
-                logger.info(f"📊 ReportMeterDataDictionary columns: {dict_columns}")
+                logger.info("📊 ReportMeterDataDictionary columns: %s", dict_columns)
                 
                 # Find value column - EnergyPlus uses 'VariableValue' in ReportMeterData
                 value_col = 'VariableValue' if 'VariableValue' in meter_columns else 'Value' if 'Value' in meter_columns else 'MeterValue' if 'MeterValue' in meter_columns else meter_columns[-1] if meter_columns else 'VariableValue'
@@ -1500,97 +1851,72 @@ class RobustEnergyPlusAPI:
                 meter_results = cursor.fetchall()
                 logger.info(f"📊 Strategy 1 (ReportMeterData): Found {len(meter_results)} facility meters")
                 
-                # Also query for breakdown meters (heating, cooling, lighting, etc.) - but don't fail if it errors
-                try:
-                    # Query for all meters, not just facility-level
-                    if 'VariableName' in dict_columns:
-                        cursor.execute("""
-                            SELECT 
-                                COALESCE(rmdd.VariableName, rmdd.KeyValue, 'Unknown') as MeterName,
-                                rmdd.ReportingFrequency,
-                                rmdd.VariableUnits,
-                                rmd.VariableValue as TotalValue
-                            FROM ReportMeterData rmd
-                            JOIN ReportMeterDataDictionary rmdd ON rmd.ReportMeterDataDictionaryIndex = rmdd.ReportMeterDataDictionaryIndex
-                            JOIN (
+                # Also list breakdown meters (heating, cooling, lighting, etc.) - diagnostic only,
+                # so skip the extra query unless debug logging is on; don't fail if it errors
+                if logger.isEnabledFor(logging.DEBUG):
+                    try:
+                        # Query for all meters, not just facility-level
+                        if 'VariableName' in dict_columns:
+                            cursor.execute("""
                                 SELECT 
-                                    rmdd2.ReportMeterDataDictionaryIndex,
-                                    MAX(rmd2.TimeIndex) as MaxTimeIndex
-                                FROM ReportMeterData rmd2
-                                JOIN ReportMeterDataDictionary rmdd2 ON rmd2.ReportMeterDataDictionaryIndex = rmdd2.ReportMeterDataDictionaryIndex
-                                WHERE (rmdd2.ReportingFrequency LIKE '%Run Period%' OR rmdd2.ReportingFrequency LIKE '%RunPeriod%')
-                                GROUP BY rmdd2.ReportMeterDataDictionaryIndex
-                            ) max_times ON rmd.ReportMeterDataDictionaryIndex = max_times.ReportMeterDataDictionaryIndex
-                                AND rmd.TimeIndex = max_times.MaxTimeIndex
-                            WHERE (rmdd.ReportingFrequency LIKE '%Run Period%' OR rmdd.ReportingFrequency LIKE '%RunPeriod%')
-                            LIMIT 50
-                        """)
-                    else:
-                        cursor.execute(f"""
-                            SELECT 
-                                rmdd.{name_col} as MeterName,
-                                rmdd.ReportingFrequency,
-                                rmdd.VariableUnits,
-                                MAX(rmd.{value_col}) as TotalValue
-                            FROM ReportMeterData rmd
-                            JOIN ReportMeterDataDictionary rmdd ON rmd.ReportMeterDataDictionaryIndex = rmdd.ReportMeterDataDictionaryIndex
-                            WHERE (rmdd.ReportingFrequency LIKE '%Run Period%' OR rmdd.ReportingFrequency LIKE '%RunPeriod%')
-                            GROUP BY rmdd.{name_col}
-                            LIMIT 50
-                        """)
-                    all_meters = cursor.fetchall()
-                    logger.info(f"📊 Found {len(all_meters)} total meters (including breakdown)")
-                    if all_meters:
-                        for result in all_meters[:20]:  # Log first 20
-                            if len(result) >= 4:
-                                name, freq, units, value = result[0], result[1], result[2], result[3]
-                                if units and units.upper() in ['J', 'JOULES']:
-                                    value_kwh = value / 3600000
-                                elif units and units.upper() in ['KWH']:
-                                    value_kwh = value
-                                else:
-                                    value_kwh = value / 3600000
-                                logger.info(f"   All meters: {name} | Units: {units} | Value: {value_kwh:.2f} kWh")
-                except Exception as e:
-                    logger.warning(f"⚠️  Could not query all meters (non-fatal): {e}")
-                
-                if meter_results:
-                    for result in meter_results:
-                        if len(result) >= 4:
-                            name, freq, units, value = result[0], result[1], result[2], result[3]
-                            # Convert based on units
-                            if units and units.upper() in ['J', 'JOULES']:
-                                value_kwh = value / 3600000
-                            elif units and units.upper() in ['KWH']:
-                                value_kwh = value
-                            else:
-                                value_kwh = value / 3600000  # Default assume J
-                            logger.info(f"   Facility meter: {name} | Units: {units} | Freq: {freq} | Value: {value_kwh:.2f} kWh")
+                                    COALESCE(rmdd.VariableName, rmdd.KeyValue, 'Unknown') as MeterName,
+                                    rmdd.ReportingFrequency,
+                                    rmdd.VariableUnits,
+                                    rmd.VariableValue as TotalValue
+                                FROM ReportMeterData rmd
+                                JOIN ReportMeterDataDictionary rmdd ON rmd.ReportMeterDataDictionaryIndex = rmdd.ReportMeterDataDictionaryIndex
+                                JOIN (
+                                    SELECT 
+                                        rmdd2.ReportMeterDataDictionaryIndex,
+                                        MAX(rmd2.TimeIndex) as MaxTimeIndex
+                                    FROM ReportMeterData rmd2
+                                    JOIN ReportMeterDataDictionary rmdd2 ON rmd2.ReportMeterDataDictionaryIndex = rmdd2.ReportMeterDataDictionaryIndex
+                                    WHERE (rmdd2.ReportingFrequency LIKE '%Run Period%' OR rmdd2.ReportingFrequency LIKE '%RunPeriod%')
+                                    GROUP BY rmdd2.ReportMeterDataDictionaryIndex
+                                ) max_times ON rmd.ReportMeterDataDictionaryIndex = max_times.ReportMeterDataDictionaryIndex
+                                    AND rmd.TimeIndex = max_times.MaxTimeIndex
+                                WHERE (rmdd.ReportingFrequency LIKE '%Run Period%' OR rmdd.ReportingFrequency LIKE '%RunPeriod%')
+                                LIMIT 50
+                            """)
                         else:
-                            name, value = result[0], result[1] if len(result) > 1 else result[-1]
-                            value_kwh = value / 3600000  # Default assume J
-                        logger.info(f"   Facility meter: {name} = {value_kwh:.2f} kWh")
+                            cursor.execute(f"""
+                                SELECT 
+                                    rmdd.{name_col} as MeterName,
+                                    rmdd.ReportingFrequency,
+                                    rmdd.VariableUnits,
+                                    MAX(rmd.{value_col}) as TotalValue
+                                FROM ReportMeterData rmd
+                                JOIN ReportMeterDataDictionary rmdd ON rmd.ReportMeterDataDictionaryIndex = rmdd.ReportMeterDataDictionaryIndex
+                                WHERE (rmdd.ReportingFrequency LIKE '%Run Period%' OR rmdd.ReportingFrequency LIKE '%RunPeriod%')
+                                GROUP BY rmdd.{name_col}
+                                LIMIT 50
+                            """)
+                        all_meters = cursor.fetchall()
+                        logger.debug("📊 Found %d total meters (including breakdown)", len(all_meters))
+                        if all_meters:
+                            for result in all_meters[:20]:  # Log first 20
+                                if len(result) >= 4:
+                                    name, freq, units, value = result[0], result[1], result[2], result[3]
+                                    value_kwh = self.meter_value_kwh(value, units)
+                                    logger.debug("   All meters: %s | Units: %s | Value: %.2f kWh", name, units, value_kwh)
+                    except Exception as e:
+                        logger.warning(f"⚠️  Could not query all meters (non-fatal): {e}")
                 
                 electricity_kwh = 0
                 gas_kwh = 0
                 total_energy = 0
                 
+                # Unpack and convert each row once, then log and classify it in the same pass
                 for result in meter_results:
                     if len(result) >= 4:
-                        name, freq, units, value = result[0], result[1], result[2], result[3]
+                        name, units, value = result[0], result[2], result[3]
                     else:
                         name = result[0]
                         value = result[1] if len(result) > 1 else result[-1]
-                        units = None
-                    
+                        units = None  # Default assume J
+                    value_kwh = self.meter_value_kwh(value, units)
+                    logger.debug("   Facility meter: %s | Units: %s | Value: %.2f kWh", name, units, value_kwh)
                     name_lower = name.lower() if name else ''
-                    # Convert based on units
-                    if units and units.upper() in ['J', 'JOULES']:
-                        value_kwh = value / 3600000
-                    elif units and units.upper() in ['KWH']:
-                        value_kwh = value
-                    else:
-                        value_kwh = value / 3600000  # Default assume J
                     
                     # Extract electricity and gas separately
                     if 'electricity:facility' in name_lower or 'electricitynet:facility' in name_lower:
@@ -1610,7 +1936,7 @@ class RobustEnergyPlusAPI:
                         else:
                             electricity_kwh += value_kwh
                         total_energy += value_kwh
-                        logger.info(f"   ✅ Heating energy: {name} = {value_kwh:.2f} kWh")
+                        logger.info("   ✅ Heating energy: %s = %.2f kWh", name, value_kwh)
                     # Match cooling energy
                     elif ('cooling' in name_lower or 'cool' in name_lower) and ('electricity' in name_lower or 'energy' in name_lower):
                         if 'cooling_energy' not in energy_data:
@@ -1618,7 +1944,7 @@ class RobustEnergyPlusAPI:
                         energy_data['cooling_energy'] += value_kwh
                         electricity_kwh += value_kwh
                         total_energy += value_kwh
-                        logger.info(f"   ✅ Cooling energy: {name} = {value_kwh:.2f} kWh")
+                        logger.info("   ✅ Cooling energy: %s = %.2f kWh", name, value_kwh)
                     # Match lighting energy (various formats)
                     elif ('lighting' in name_lower or 'lights' in name_lower or 'interiorlights' in name_lower) and ('electricity' in name_lower or 'energy' in name_lower):
                         if 'lighting_energy' not in energy_data:
@@ -1626,7 +1952,7 @@ class RobustEnergyPlusAPI:
                         energy_data['lighting_energy'] += value_kwh
                         electricity_kwh += value_kwh
                         total_energy += value_kwh
-                        logger.info(f"   ✅ Lighting energy: {name} = {value_kwh:.2f} kWh")
+                        logger.info("   ✅ Lighting energy: %s = %.2f kWh", name, value_kwh)
                     # Match equipment energy (various formats)
                     elif ('equipment' in name_lower or 'interiorequipment' in name_lower or 'plug' in name_lower) and ('electricity' in name_lower or 'energy' in name_lower):
                         if 'equipment_energy' not in energy_data:
@@ -1634,7 +1960,7 @@ class RobustEnergyPlusAPI:
                         energy_data['equipment_energy'] += value_kwh
                         electricity_kwh += value_kwh
                         total_energy += value_kwh
-                        logger.info(f"   ✅ Equipment energy: {name} = {value_kwh:.2f} kWh")
+                        logger.info("   ✅ Equipment energy: %s = %.2f kWh", name, value_kwh)
                     # Match fans energy
                     elif ('fan' in name_lower or 'fans' in name_lower) and ('electricity' in name_lower or 'energy' in name_lower):
                         if 'fans_energy' not in energy_data:
@@ -1642,7 +1968,7 @@ class RobustEnergyPlusAPI:
                         energy_data['fans_energy'] += value_kwh
                         electricity_kwh += value_kwh
                         total_energy += value_kwh
-                        logger.info(f"   ✅ Fans energy: {name} = {value_kwh:.2f} kWh")
+                        logger.info("   ✅ Fans energy: %s = %.2f kWh", name, value_kwh)
                     # Match pumps energy
                     elif ('pump' in name_lower or 'pumps' in name_lower) and ('electricity' in name_lower or 'energy' in name_lower):
                         if 'pumps_energy' not in energy_data:
@@ -1650,7 +1976,7 @@ class RobustEnergyPlusAPI:
                         energy_data['pumps_energy'] += value_kwh
                         electricity_kwh += value_kwh
                         total_energy += value_kwh
-                        logger.info(f"   ✅ Pumps energy: {name} = {value_kwh:.2f} kWh")
+                        logger.info("   ✅ Pumps energy: %s = %.2f kWh", name, value_kwh)
                 
                 if total_energy > 0:
                     energy_data['total_energy_consumption'] = round(total_energy, 2)
@@ -1700,15 +2026,8 @@ class RobustEnergyPlusAPI:
                         for name, units, freq, value in report_results[:5]:
                             logger.info(f"   Raw: {name} | Units: '{units}' | Freq: {freq} | Value: {value}")
                             # EnergyPlus stores in Joules - convert to kWh
-                            if units in ['J', 'Joules', '']:
-                                value_kwh = value / 3600000  # J to kWh
-                                logger.info(f"   Converted (J→kWh): {value_kwh:.2f} kWh")
-                            elif units in ['kWh', 'KWH']:
-                                value_kwh = value
-                                logger.info(f"   Already kWh: {value_kwh:.2f} kWh")
-                            else:
-                                value_kwh = value / 3600000  # Default assume J
-                                logger.info(f"   Unknown units '{units}', assuming J: {value_kwh:.2f} kWh")
+                            value_kwh = self.meter_value_kwh(value, units)
+                            logger.info(f"   Converted ({units or 'J'}→kWh): {value_kwh:.2f} kWh")
                     
                     total_energy = 0
                     electricity_kwh = 0
@@ -1722,14 +2041,7 @@ class RobustEnergyPlusAPI:
                             continue
                         
                         # Convert to kWh based on units
-                        if units in ['J', 'Joules']:
-                            value_kwh = value / 3600000
-                        elif units == 'GJ':
-                            value_kwh = value * 277.778
-                        elif units in ['kWh', 'kWh']:
-                            value_kwh = value
-                        else:
-                            value_kwh = value / 3600000  # Default assume J
+                        value_kwh = self.meter_value_kwh(value, units)
                         
                         # Only use facility-level totals
                         if 'electricity:facility' in name_lower or 'electricitynet:facility' in name_lower:
@@ -1820,7 +2132,7 @@ class RobustEnergyPlusAPI:
                     
                     for name, value in annual_results:
                         name_lower = name.lower()
-                        value_kwh = value / 3600000 if value > 1000000 else value  # Assume J if large, otherwise kWh
+                        value_kwh = value / J_PER_KWH if value > 1000000 else value  # Assume J if large, otherwise kWh
                         
                         if 'total' in name_lower or 'facility' in name_lower:
                             if 'total_energy_consumption' not in energy_data:
@@ -1835,9 +2147,6 @@ class RobustEnergyPlusAPI:
                     logger.warning(f"⚠️  Strategy 3 failed: {e}")
             
             # VALIDATION: Check if values are reasonable for simulation period
-            # Get simulation period (default to 7 days if not set)
-            simulation_days = getattr(self, 'current_simulation_days', 7)
-            
             if simulation_days > 0 and energy_data.get('total_energy_consumption', 0) > 0:
                 total_energy = energy_data['total_energy_consumption']
                 building_area = energy_data.get('building_area', 0)
@@ -1871,7 +2180,7 @@ class RobustEnergyPlusAPI:
                                 energy_data['total_energy_consumption'] = round(corrected_total, 2)
                                 
                                 # Also correct breakdown if present
-                                for key in ['heating_energy', 'cooling_energy', 'lighting_energy', 'equipment_energy', 'fans_energy', 'pumps_energy']:
+                                for key in BREAKDOWN_FIELDS:
                                     if key in energy_data and energy_data[key] > 0:
                                         energy_data[key] = round(energy_data[key] * correction_factor, 2)
                                 
@@ -1883,20 +2192,13 @@ class RobustEnergyPlusAPI:
                                 logger.warning(f"   ⚠️  Correction didn't help enough (improvement: {improvement_ratio:.2f}, still {corrected_total/max_expected:.1f}x expected)")
             
             # Round all energy values
-            for key in ['heating_energy', 'cooling_energy', 'lighting_energy', 'equipment_energy', 'fans_energy', 'pumps_energy']:
+            for key in BREAKDOWN_FIELDS:
                 if key in energy_data:
                     energy_data[key] = round(energy_data[key], 2)
             
             # Calculate total from breakdown if we have breakdown but no total
             if energy_data.get('total_energy_consumption', 0) == 0:
-                breakdown_total = sum([
-                    energy_data.get('heating_energy', 0),
-                    energy_data.get('cooling_energy', 0),
-                    energy_data.get('lighting_energy', 0),
-                    energy_data.get('equipment_energy', 0),
-                    energy_data.get('fans_energy', 0),
-                    energy_data.get('pumps_energy', 0)
-                ])
+                breakdown_total = self.breakdown_total(energy_data)
                 if breakdown_total > 0:
                     energy_data['total_energy_consumption'] = round(breakdown_total, 2)
                     logger.info(f"✅ Calculated total from breakdown: {breakdown_total:.2f} kWh")
@@ -1947,9 +2249,9 @@ class RobustEnergyPlusAPI:
         
         return energy_data
     
-    def collect_output_info(self, output_dir, err_file):
+    def collect_output_info(self, output_dir, err_file, err_content=None):
         """
-        Collect additional output information:
+        Collect additional output information (err_content: error file text if already read):
         - Full error file content
         - List of generated output files
         - CSV preview (first 500 lines)
@@ -1961,16 +2263,21 @@ class RobustEnergyPlusAPI:
             # 1. Full error file content (limit to 100KB to avoid response size issues)
             if err_file and os.path.exists(err_file):
                 try:
-                    with open(err_file, 'r', encoding='utf-8', errors='ignore') as f:
-                        error_content = f.read()
+                    # Reuse the content parse_energyplus_output already read instead of reading the file again
+                    if err_content is not None:
+                        error_content = err_content
+                    else:
+                        with open(err_file, 'r', encoding='utf-8', errors='ignore') as f:
+                            error_content = f.read()
                     # Limit size to prevent huge responses (keep last 100KB if too large)
                     max_error_size = 100 * 1024  # 100KB
                     if len(error_content) > max_error_size:
                         logger.warning(f"⚠️  Error file is large ({len(error_content)} chars), truncating to last {max_error_size} chars")
+                        original_size = len(error_content)
                         error_content = error_content[-max_error_size:]
                         output_info['error_file_content'] = error_content
                         output_info['error_file_truncated'] = True
-                        output_info['error_file_original_size'] = len(f.read()) if os.path.exists(err_file) else 0
+                        output_info['error_file_original_size'] = original_size
                     else:
                         output_info['error_file_content'] = error_content
                         output_info['error_file_truncated'] = False
@@ -1980,25 +2287,29 @@ class RobustEnergyPlusAPI:
                     output_info['error_file_content'] = f"Error reading file: {str(e)}"
             
             # 2. List of generated output files
-            output_files = []
+            # One scandir pass gives the file type without extra stat calls; keep
+            # (name, size, is_file) tuples for the checks below and build the
+            # response dicts once
+            file_entries = []
             if os.path.exists(output_dir):
-                for file in sorted(os.listdir(output_dir)):
-                    file_path = os.path.join(output_dir, file)
-                    file_info = {
-                        "name": file,
-                        "size": os.path.getsize(file_path) if os.path.isfile(file_path) else 0,
-                        "type": "file" if os.path.isfile(file_path) else "directory"
-                    }
-                    output_files.append(file_info)
-            
+                with os.scandir(output_dir) as entries:
+                    for entry in entries:
+                        is_file = entry.is_file()
+                        file_entries.append((entry.name, entry.stat().st_size if is_file else 0, is_file))
+                file_entries.sort()
+            
+            output_files = [
+                {"name": name, "size": size, "type": "file" if is_file else "directory"}
+                for name, size, is_file in file_entries
+            ]
             output_info['output_files'] = output_files
             logger.info(f"✅ Listed {len(output_files)} output files")
             
             # 3. CSV preview (first 500 lines)
             csv_previews = {}
-            for file in output_files:
-                if file['name'].endswith('.csv') and file['type'] == 'file':
-                    csv_path = os.path.join(output_dir, file['name'])
+            for name, size, is_file in file_entries:
+                if name.endswith('.csv') and is_file:
+                    csv_path = os.path.join(output_dir, name)
                     try:
                         lines = []
                         total_lines = 0
@@ -2008,26 +2319,26 @@ class RobustEnergyPlusAPI:
                                 if i < 500:  # First 500 lines
                                     lines.append(line.rstrip('\n\r'))
                         
-                        csv_previews[file['name']] = {
+                        csv_previews[name] = {
                             "lines": lines,
                             "total_lines": total_lines,
                             "preview_lines": len(lines)
                         }
-                        logger.info(f"✅ Captured CSV preview for {file['name']} ({len(lines)}/{total_lines} lines)")
+                        logger.info(f"✅ Captured CSV preview for {name} ({len(lines)}/{total_lines} lines)")
                     except Exception as e:
-                        logger.warning(f"⚠️  Could not read CSV {file['name']}: {e}")
+                        logger.warning(f"⚠️  Could not read CSV {name}: {e}")
             
             if csv_previews:
                 output_info['csv_previews'] = csv_previews
             
             # 4. SQLite database info
             sqlite_info = {}
-            for file in output_files:
+            for name, size, is_file in file_entries:
                 # EnergyPlus generates SQLite as .sql files (eplusout.sql)
-                if (file['name'].endswith('.sqlite') or file['name'].endswith('.sqlite3') or 
-                    file['name'].endswith('.db') or 
-                    (file['name'].endswith('.sql') and 'eplusout' in file['name'])):
-                    sqlite_path = os.path.join(output_dir, file['name'])
+                if (name.endswith('.sqlite') or name.endswith('.sqlite3') or 
+                    name.endswith('.db') or 
+                    (name.endswith('.sql') and 'eplusout' in name)):
+                    sqlite_path = os.path.join(output_dir, name)
                     try:
                         import sqlite3
                         if os.path.exists(sqlite_path):
@@ -2052,18 +2363,18 @@ class RobustEnergyPlusAPI:
                                     "columns": columns
                                 }
                             
-                            sqlite_info[file['name']] = {
+                            sqlite_info[name] = {
                                 "tables": tables,
                                 "table_info": table_info,
-                                "file_size": file['size']
+                                "file_size": size
                             }
                             
                             conn.close()
-                            logger.info(f"✅ Captured SQLite info for {file['name']} ({len(tables)} tables)")
+                            logger.info(f"✅ Captured SQLite info for {name} ({len(tables)} tables)")
                     except ImportError:
                         logger.warning("⚠️  sqlite3 module not available, cannot read SQLite files")
                     except Exception as e:
-                        logger.warning(f"⚠️  Could not read SQLite {file['name']}: {e}")
+                        logger.warning(f"⚠️  Could not read SQLite {name}: {e}")
             
             if sqlite_info:
                 output_info['sqlite_info'] = sqlite_info
@@ -2075,7 +2386,11 @@ class RobustEnergyPlusAPI:
         
         return output_info
     
-    def add_calculated_metrics(self, energy_data):
+    def breakdown_total(self, energy_data):
+        """Sum of the six main end-use categories (kWh)"""
+        return sum(energy_data.get(field, 0) for field in BREAKDOWN_FIELDS)
+    
+    def add_calculated_metrics(self, energy_data, idf_content=None):
         """Add calculated metrics like peak demand, performance rating, building area"""
         try:
             total_energy = energy_data.get('total_energy_consumption', 0)
@@ -2100,9 +2415,9 @@ class RobustEnergyPlusAPI:
             # So we use total_energy directly without additional annualization
             if total_energy > 0 and building_area > 0:
                 energy_intensity = total_energy / building_area
-                energy_data['energy_intensity'] = round(energy_intensity, 2)
-                energy_data['energyUseIntensity'] = round(energy_intensity, 2)  # camelCase for UI
-                logger.info(f"✅ Calculated EUI: {energy_intensity:.2f} kWh/m²/year from {total_energy:.2f} kWh / {building_area:.2f} m²")
+                # Round once - the snake_case and camelCase (for UI) keys carry the same value
+                energy_data['energy_intensity'] = energy_data['energyUseIntensity'] = round(energy_intensity, 2)
+                logger.info("✅ Calculated EUI: %.2f kWh/m²/year from %.2f kWh / %.2f m²", energy_intensity, total_energy, building_area)
                 
                 # FIX 3: Validate EUI - detect suspiciously low values
                 if energy_intensity < 5:
@@ -2112,14 +2427,7 @@ class RobustEnergyPlusAPI:
                     logger.warning(f"   Total energy: {total_energy:.2f} kWh for {building_area:.2f} m² building")
                     
                     # Check breakdown completeness
-                    breakdown_total = (
-                        energy_data.get('heating_energy', 0) +
-                        energy_data.get('cooling_energy', 0) +
-                        energy_data.get('lighting_energy', 0) +
-                        energy_data.get('equipment_energy', 0) +
-                        energy_data.get('fans_energy', 0) +
-                        energy_data.get('pumps_energy', 0)
-                    )
+                    breakdown_total = self.breakdown_total(energy_data)
                     
                     if breakdown_total < total_energy * 0.5:
                         logger.warning(f"⚠️  CRITICAL: Breakdown ({breakdown_total:.2f} kWh) is <50% of total ({total_energy:.2f} kWh)")
@@ -2135,134 +2443,126 @@ class RobustEnergyPlusAPI:
             # Calculate peak demand (kW)
             # Peak demand is typically 1.2-1.5x the average hourly consumption
             if total_energy > 0:
-                # Assume 2920 operating hours/year (typical for commercial building)
-                avg_hourly = total_energy / 2920
-                peak_demand = avg_hourly * 1.3  # Peak factor
-                energy_data['peak_demand'] = round(peak_demand, 2)
-                energy_data['peakDemand'] = round(peak_demand, 2)  # camelCase for UI
+                # Assume 2920 operating hours/year (typical for commercial building), 1.3x peak factor
+                peak_demand = total_energy * PEAK_DEMAND_FACTOR
+                energy_data['peak_demand'] = energy_data['peakDemand'] = round(peak_demand, 2)  # + camelCase for UI
             
             # Calculate performance rating based on energy intensity
             if 'energy_intensity' in energy_data:
-                eui = energy_data['energy_intensity']
-                if eui < 100:
-                    rating = "Excellent"
-                    score = 95
-                elif eui < 150:
-                    rating = "Good"
-                    score = 80
-                elif eui < 200:
-                    rating = "Average"
-                    score = 65
-                elif eui < 250:
-                    rating = "Below Average"
-                    score = 50
-                else:
-                    rating = "Poor"
-                    score = 35
+                rating, score = performance_rating_for_eui(energy_data['energy_intensity'])
                 
-                energy_data['performance_rating'] = rating
-                energy_data['performanceRating'] = rating  # camelCase for UI
-                energy_data['performance_score'] = score
-                energy_data['performanceScore'] = score  # camelCase for UI
+                energy_data['performance_rating'] = energy_data['performanceRating'] = rating  # + camelCase for UI
+                energy_data['performance_score'] = energy_data['performanceScore'] = score  # + camelCase for UI
             
             # Extract thermal properties from IDF if available
-            if self.current_idf_content:
-                thermal_props = self.extract_thermal_properties(self.current_idf_content)
+            if idf_content:
+                thermal_props = self.extract_thermal_properties(idf_content)
                 energy_data.update(thermal_props)
             
-            logger.info(f"✅ Calculated metrics:")
-            logger.info(f"   Building Area: {building_area:.2f} m²")
-            logger.info(f"   Energy Intensity: {energy_data.get('energy_intensity', 0):.2f} kWh/m²")
-            logger.info(f"   Peak Demand: {energy_data.get('peak_demand', 0):.2f} kW")
-            logger.info(f"   Performance: {energy_data.get('performance_rating', 'N/A')}")
+            # Lazy %-style arguments - nothing is formatted unless INFO is enabled
+            logger.info("✅ Calculated metrics:")
+            logger.info("   Building Area: %.2f m²", building_area)
+            logger.info("   Energy Intensity: %.2f kWh/m²", energy_data.get('energy_intensity', 0))
+            logger.info("   Peak Demand: %.2f kW", energy_data.get('peak_demand', 0))
+            logger.info("   Performance: %s", energy_data.get('performance_rating', 'N/A'))
             if 'wall_r_value' in energy_data:
-                logger.info(f"   Wall R-value: {energy_data['wall_r_value']:.2f}")
+                logger.info("   Wall R-value: %.2f", energy_data['wall_r_value'])
             if 'window_u_value' in energy_data:
-                logger.info(f"   Window U-value: {energy_data['window_u_value']:.3f}")
+                logger.info("   Window U-value: %.3f", energy_data['window_u_value'])
             
         except Exception as e:
             logger.error(f"❌ Error calculating metrics: {e}")
     
+    def split_idf_fields(self, object_body):
+        """Split the body of an IDF object (text between the class name and ';') into stripped fields"""
+        # Drop "!" comments line by line first - fields and comments often share a line
+        # ("0.1016,   !- Thickness {m}"), then split the remaining text on commas
+        return [field.strip() for field in ''.join(line.split('!', 1)[0] for line in object_body.split('\n')).split(',')]
+    
     def extract_thermal_properties(self, idf_content):
         """Extract R-values for walls and U-values for windows from IDF"""
+        cache_key = hashlib.blake2b(idf_content.encode('utf-8', errors='ignore'), digest_size=16).digest()
+        with self.thermal_cache_lock:
+            cached_props = self.thermal_cache.get(cache_key)
+            if cached_props is not None:
+                self.thermal_cache.move_to_end(cache_key)
+                return dict(cached_props)
+        
         thermal_props = {}
         
         try:
-            import re
-            
-            # Extract wall constructions and materials
-            # Look for exterior wall constructions
-            wall_constructions = re.findall(r'Construction,([^;]+);', idf_content, re.IGNORECASE | re.DOTALL)
-            
-            wall_r_values = []
-            window_u_values = []
-            
-            # Look for Material objects and extract R-values
-            materials = re.findall(r'Material,\s*([^;]+);', idf_content, re.DOTALL)
-            for material in materials:
-                lines = [l.strip() for l in material.split('\n') if l.strip() and not l.strip().startswith('!')]
-                if len(lines) >= 5:
-                    try:
-                        # Material format: Name, Roughness, Thickness, Conductivity, Density, Specific Heat, Thermal Absorptance...
-                        thickness = float(lines[2].replace(',', '').strip())
-                        conductivity = float(lines[3].replace(',', '').strip())
-                        if conductivity > 0:
-                            r_value = thickness / conductivity  # R = thickness / conductivity
-                            if r_value > 0.1:  # Filter out very thin materials
-                                wall_r_values.append(r_value)
-                    except:
-                        pass
-            
-            # Look for WindowMaterial:SimpleGlazingSystem objects
-            simple_glazing = re.findall(r'WindowMaterial:SimpleGlazingSystem,\s*([^;]+);', idf_content, re.DOTALL)
-            for glazing in simple_glazing:
-                lines = [l.strip() for l in glazing.split('\n') if l.strip() and not l.strip().startswith('!')]
-                if len(lines) >= 2:
-                    try:
-                        # Format: Name, U-Factor, SHGC
-                        u_factor = float(lines[1].replace(',', '').strip())
-                        if u_factor > 0:
-                            window_u_values.append(u_factor)
-                    except:
-                        pass
-            
-            # Look for WindowMaterial:Glazing objects
-            glazing_materials = re.findall(r'WindowMaterial:Glazing,\s*([^;]+);', idf_content, re.DOTALL)
-            for glazing in glazing_materials:
-                lines = [l.strip() for l in glazing.split('\n') if l.strip() and not l.strip().startswith('!')]
-                if len(lines) >= 4:
+            # Running totals and counts instead of value lists - the averages need nothing else
+            wall_r_total = 0.0
+            wall_r_count = 0
+            window_u_total = 0.0
+            window_u_count = 0
+            
+            # Scan Material, WindowMaterial:SimpleGlazingSystem and WindowMaterial:Glazing in one pass
+            for match in THERMAL_OBJECT_PATTERN.finditer(idf_content):
+                object_type = match.group(1)
+                fields = self.split_idf_fields(match.group(2))
+                
+                if object_type == 'Material':
+                    if len(fields) >= 5:
+                        try:
+                            # Material format: Name, Roughness, Thickness, Conductivity, Density, Specific Heat, Thermal Absorptance...
+                            thickness = float(fields[2])
+                            conductivity = float(fields[3])
+                            if conductivity > 0:
+                                r_value = thickness / conductivity  # R = thickness / conductivity
+                                if r_value > 0.1:  # Filter out very thin materials
+                                    wall_r_total += r_value
+                                    wall_r_count += 1
+                        except ValueError:
+                            pass
+                
+                elif object_type == 'WindowMaterial:SimpleGlazingSystem':
+                    if len(fields) >= 2:
+                        try:
+                            # Format: Name, U-Factor, SHGC
+                            u_factor = float(fields[1])
+                            if u_factor > 0:
+                                window_u_total += u_factor
+                                window_u_count += 1
+                        except ValueError:
+                            pass
+                
+                elif len(fields) >= 4:  # WindowMaterial:Glazing
                     try:
                         # Approximate U-value from thickness and conductivity
-                        thickness = float(lines[2].replace(',', '').strip())
-                        conductivity = float(lines[3].replace(',', '').strip())
+                        thickness = float(fields[2])
+                        conductivity = float(fields[3])
                         if thickness > 0 and conductivity > 0:
                             u_value = conductivity / thickness
-                            window_u_values.append(u_value)
-                    except:
+                            window_u_total += u_value
+                            window_u_count += 1
+                    except ValueError:
                         pass
             
             # Calculate averages
-            if wall_r_values:
-                avg_wall_r = sum(wall_r_values) / len(wall_r_values)
-                thermal_props['wall_r_value'] = round(avg_wall_r, 2)
-                thermal_props['wallRValue'] = round(avg_wall_r, 2)  # camelCase
-            
-            if window_u_values:
-                avg_window_u = sum(window_u_values) / len(window_u_values)
-                thermal_props['window_u_value'] = round(avg_window_u, 3)
-                thermal_props['windowUValue'] = round(avg_window_u, 3)  # camelCase
+            if wall_r_count:
+                avg_wall_r = wall_r_total / wall_r_count
+                thermal_props['wall_r_value'] = thermal_props['wallRValue'] = round(avg_wall_r, 2)  # + camelCase
+            
+            if window_u_count:
+                avg_window_u = window_u_total / window_u_count
+                thermal_props['window_u_value'] = thermal_props['windowUValue'] = round(avg_window_u, 3)  # + camelCase
                 # Also provide R-value for windows (R = 1/U)
                 if avg_window_u > 0:
-                    thermal_props['window_r_value'] = round(1/avg_window_u, 2)
-                    thermal_props['windowRValue'] = round(1/avg_window_u, 2)  # camelCase
+                    thermal_props['window_r_value'] = thermal_props['windowRValue'] = round(1/avg_window_u, 2)  # + camelCase
             
-            logger.info(f"📊 Thermal properties extracted:")
-            logger.info(f"   Wall materials found: {len(wall_r_values)}")
-            logger.info(f"   Window materials found: {len(window_u_values)}")
+            logger.info("📊 Thermal properties extracted:")
+            logger.info("   Wall materials found: %d", wall_r_count)
+            logger.info("   Window materials found: %d", window_u_count)
             
         except Exception as e:
             logger.error(f"❌ Error extracting thermal properties: {e}")
         
+        with self.thermal_cache_lock:
+            self.thermal_cache[cache_key] = dict(thermal_props)
+            if len(self.thermal_cache) > THERMAL_CACHE_SIZE:
+                self.thermal_cache.popitem(last=False)
+        
         return thermal_props
     
     def compare_measured_data(self, simulated_result, measured_data):
@@ -2378,40 +2678,66 @@ class RobustEnergyPlusAPI:
             response['warnings'] = warnings
         return response
     
-    def handle_request(self, client_socket):
-        """Handle incoming HTTP request"""
+    def handle_request(self, client_socket, reserved=False):
+        """Handle incoming HTTP request (reserved: running on a reserved worker - only /health and
+        /download are served, anything else gets 503 without its body being read)"""
         try:
             # Read request
-            request_text = self.read_request_simple(client_socket)
+            request_data = self.read_request_simple(client_socket, read_body=not reserved)
+            if request_data is None:
+                client_socket.close()
+                return
             
             # Parse request
-            if not request_text:
+            if not request_data:
                 self.send_error_response(client_socket, "Empty request")
                 return
             
-            # Extract base URL from request for file downloads
-            if 'Host:' in request_text:
-                for line in request_text.split('\r\n'):
-                    if line.startswith('Host:'):
-                        host = line.split(':', 1)[1].strip()
-                        # Try to detect if HTTPS (in production) or HTTP (local)
-                        protocol = 'https' if 'railway' in host or 'heroku' in host else 'http'
-                        self.base_url = f"{protocol}://{host}"
-                        break
+            # Decode only the request line and headers - the body can be many MB of IDF/EPW
+            header_end = request_data.find(b'\r\n\r\n')
+            if header_end == -1:
+                request_text = request_data.decode('utf-8', errors='ignore')
+                body = b''
+            else:
+                request_text = request_data[:header_end].decode('utf-8', errors='ignore')
+                body = request_data[header_end + 4:]
+            
+            # Route on the request line ("METHOD /path HTTP/1.1") instead of searching the whole request
+            request_line_parts = request_text.split('\r\n', 1)[0].split(' ')
+            method = request_line_parts[0]
+            target = request_line_parts[1].split('?', 1) if len(request_line_parts) > 1 else ['']
+            path = target[0]
+            # Responses are compact JSON; ?pretty=1 asks for indented output (for humans)
+            pretty = len(target) > 1 and parse_qs(target[1]).get('pretty') == ['1']
+            
+            if reserved and not (method == 'GET' and (path in ('/health', '/healthz') or path.startswith('/download/'))):
+                self.send_error_response(client_socket, "Server busy", status=b"503 Service Unavailable", drain=True)
+                return
             
             # Check if health check
-            if 'GET /health' in request_text or 'GET /healthz' in request_text:
+            if method == 'GET' and path in ('/health', '/healthz'):
                 self.handle_health(client_socket)
                 return
             
             # Check if download endpoint
-            if 'GET /download/' in request_text:
-                self.handle_download(client_socket, request_text)
+            if method == 'GET' and path.startswith('/download/'):
+                self.handle_download(client_socket, path)
                 return
             
-            # Check if simulate endpoint
-            if 'POST /simulate' in request_text:
-                self.handle_simulate(client_socket, request_text)
+            # Simulate endpoints - one dict lookup instead of comparing against each path
+            handler_name = POST_ROUTES.get(path) if method == 'POST' else None
+            if handler_name is not None:
+                # Extract base URL from request for file downloads - kept per request, since
+                # concurrent requests may arrive under different host names
+                base_url = None
+                host_match = HOST_HEADER_PATTERN.search(request_text)
+                if host_match:
+                    host = host_match.group(1).strip()
+                    # Try to detect if HTTPS (in production) or HTTP (local)
+                    protocol = 'https' if 'railway' in host or 'heroku' in host else 'http'
+                    base_url = f"{protocol}://{host}"
+                
+                getattr(self, handler_name)(client_socket, body, base_url, pretty)
                 return
             
             # Unknown endpoint
@@ -2423,27 +2749,12 @@ class RobustEnergyPlusAPI:
     
     def handle_health(self, client_socket):
         """Handle health check"""
-        response = {
-            "status": "healthy",
-            "version": self.version,
-            "energyplus_available": getattr(self, 'energyplus_available', False) or os.path.exists(self.energyplus_exe),
-            "energyplus_exe": self.energyplus_exe,
-            "energyplus_idd": self.energyplus_idd,
-            "timestamp": datetime.now().isoformat()
-        }
-        self.send_json_response(client_socket, response)
+        available = bool(self.energyplus_available or os.path.exists(self.energyplus_exe))
+        self.send_json_response(client_socket, None, json_data=self.add_timestamp(self.health_body_prefixes[available]))
     
-    def handle_download(self, client_socket, request_text):
-        """Handle file download request"""
+    def handle_download(self, client_socket, path):
+        """Handle file download request (path: /download/{simulation_id}/{filename})"""
         try:
-            # Extract path from request: GET /download/{simulation_id}/{filename}
-            path_start = request_text.find('GET /download/')
-            if path_start == -1:
-                self.send_error_response(client_socket, "Invalid download path")
-                return
-            
-            path_line = request_text[path_start:].split('\r\n')[0]
-            path = path_line.split(' ')[1]  # GET /download/...
             parts = path.split('/')
             
             if len(parts) < 4:  # /download/{sim_id}/{filename}
@@ -2471,41 +2782,17 @@ class RobustEnergyPlusAPI:
                 return
             
             # Determine content type
-            content_type = 'application/octet-stream'
-            if filename.endswith('.html') or filename.endswith('.htm'):
-                content_type = 'text/html'
-            elif filename.endswith('.csv'):
-                content_type = 'text/csv'
-            elif filename.endswith('.json'):
-                content_type = 'application/json'
-            elif filename.endswith('.sql'):
-                content_type = 'application/x-sqlite3'
-            elif filename.endswith('.txt') or filename.endswith('.err'):
-                content_type = 'text/plain'
-            elif filename.endswith('.xml'):
-                content_type = 'application/xml'
-            
-            # Read file and send
+            content_type = DOWNLOAD_CONTENT_TYPES.get(os.path.splitext(filename)[1], 'application/octet-stream')
+            
+            # Stream the file with sendfile - the kernel copies it straight to the socket
+            # instead of reading the whole file into memory and slicing it into chunks
             with open(file_path, 'rb') as f:
-                file_content = f.read()
-            
-            file_size = len(file_content)
-            response = f"HTTP/1.1 200 OK\r\n"
-            response += f"Content-Type: {content_type}\r\n"
-            response += f"Content-Length: {file_size}\r\n"
-            response += f"Content-Disposition: attachment; filename=\"{filename}\"\r\n"
-            response += f"Access-Control-Allow-Origin: *\r\n"
-            response += f"Connection: close\r\n"
-            response += f"\r\n"
-            
-            # Send headers
-            client_socket.sendall(response.encode('utf-8'))
-            
-            # Send file content in chunks
-            chunk_size = 65536  # 64KB chunks
-            for i in range(0, file_size, chunk_size):
-                chunk = file_content[i:i+chunk_size]
-                client_socket.sendall(chunk)
+                file_size = os.fstat(f.fileno()).st_size
+                header = DOWNLOAD_RESPONSE_HEADER % (content_type.encode('ascii'), file_size, filename.encode('utf-8'))
+                
+                # Send headers, then the file content
+                client_socket.sendall(header)
+                client_socket.sendfile(f)
             
             logger.info(f"📥 Served file: {filename} ({file_size / 1024 / 1024:.2f} MB) for simulation {simulation_id}")
             client_socket.close()
@@ -2514,65 +2801,34 @@ class RobustEnergyPlusAPI:
             logger.error(f"❌ Download error: {e}")
             self.send_error_response(client_socket, f"Download error: {str(e)}")
     
-    def handle_simulate(self, client_socket, request_text):
-        """Handle simulation request"""
+    def handle_simulate(self, client_socket, body, base_url=None, pretty=False):
+        """Handle simulation request (body: raw JSON request body bytes, pretty: indent the response)"""
         try:
             # Set socket timeout to prevent Railway timeout issues
             # Railway typically has 30-60s timeout, so we need to be careful
             client_socket.settimeout(600.0)  # 10 minutes for entire request
             
-            # Extract JSON body
-            body_start = request_text.find('\r\n\r\n') + 4
-            body = request_text[body_start:]
-            
             logger.info(f"📊 Request body size: {len(body)} bytes")
             
-            # Parse JSON
+            # Parse JSON straight from the request bytes - no decode step
             try:
-                data = json.loads(body)
-            except json.JSONDecodeError as e:
+                data = self.decode_json(body)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
                 logger.error(f"❌ JSON parse error: {e}")
                 self.send_error_response(client_socket, f"Invalid JSON: {str(e)}")
                 return
             
-            # Extract IDF and weather content
-            idf_content = data.get('idf_content', '')
-            weather_content = data.get('weather_content', '')
-            measured_data = data.get('measured_data', None)
-            
-            if not idf_content:
-                self.send_error_response(client_socket, "Missing idf_content")
+            # Check the request shape up front instead of failing part-way through the simulation
+            request_error = self.validate_simulation_request(data)
+            if request_error:
+                self.send_error_response(client_socket, request_error)
                 return
             
-            # Validate weather content (check for empty/whitespace-only)
-            if weather_content and not weather_content.strip():
-                logger.warning("⚠️  Weather content is whitespace-only, treating as empty")
-                weather_content = ''
-            
-            # Check for extremely large weather files (warn if > 10 MB)
-            if weather_content and len(weather_content) > 10 * 1024 * 1024:
-                logger.warning(f"⚠️  Large weather file: {len(weather_content) / 1024 / 1024:.1f} MB (may cause memory issues)")
-            
-            logger.info(f"📊 IDF content: {len(idf_content)} bytes")
-            logger.info(f"📊 Weather content: {len(weather_content)} bytes")
-            if measured_data:
-                logger.info(f"📊 Measured data provided: {measured_data.get('total_annual_kwh', 'N/A')} kWh")
-            
-            # For Railway, we need to send a keep-alive or process quickly
-            # Reduce simulation timeout to match Railway's limits better
-            # Run simulation with reduced timeout for Railway compatibility
-            logger.info("⚡ Starting simulation (Railway-optimized)...")
-            result = self.run_energyplus_simulation(idf_content, weather_content)
-            
-            # Compare with measured data if provided
-            if measured_data and result.get('simulation_status') == 'success':
-                comparison = self.compare_measured_data(result, measured_data)
-                if comparison:
-                    result.update(comparison)
+            result = self.run_simulation_request(data, base_url)
             
             # Send response immediately after simulation
             logger.info("📤 Sending response...")
-            self.send_json_response(client_socket, result)
+            self.send_json_response(client_socket, result, pretty=pretty)
             logger.info("✅ Response sent successfully")
             
         except socket.timeout:
@@ -2585,71 +2841,343 @@ class RobustEnergyPlusAPI:
             logger.error(f"Traceback: {traceback.format_exc()}")
             self.send_error_response(client_socket, str(e))
     
-    def send_json_response(self, client_socket, data):
-        """Send JSON HTTP response"""
+    def handle_simulate_raw(self, client_socket, body, base_url=None, pretty=False):
+        """Handle simulation request whose body is the IDF file itself (no JSON wrapper, no weather)"""
         try:
-            json_data = json.dumps(data, indent=2)
-            response = f"HTTP/1.1 200 OK\r\n"
-            response += f"Content-Type: application/json\r\n"
-            response += f"Content-Length: {len(json_data)}\r\n"
-            response += f"Access-Control-Allow-Origin: *\r\n"
-            response += f"Connection: close\r\n"
-            response += f"\r\n"
-            response += json_data
-            
-            # Send response in chunks if large
-            response_bytes = response.encode('utf-8')
-            if len(response_bytes) > 100000:  # > 100KB
-                logger.info(f"📤 Sending large response ({len(response_bytes)} bytes) in chunks...")
-                chunk_size = 32768
-                for i in range(0, len(response_bytes), chunk_size):
-                    chunk = response_bytes[i:i+chunk_size]
-                    client_socket.sendall(chunk)
-                    logger.info(f"   Sent chunk {i//chunk_size + 1} ({len(chunk)} bytes)")
+            client_socket.settimeout(600.0)  # 10 minutes for entire request
+            
+            logger.info(f"📊 Raw IDF body size: {len(body)} bytes")
+            
+            # The body is used as the IDF directly - no JSON DOM to build and no escaped string to unpack
+            data = {'idf_content': body.decode('utf-8', errors='ignore')}
+            request_error = self.validate_simulation_request(data)
+            if request_error:
+                self.send_error_response(client_socket, request_error)
+                return
+            
+            result = self.run_simulation_request(data, base_url)
+            self.send_json_response(client_socket, result, pretty=pretty)
+            
+        except socket.timeout:
+            error_msg = "Request timed out - simulation took too long"
+            logger.error(f"❌ {error_msg}")
+            self.send_error_response(client_socket, error_msg)
+        except Exception as e:
+            logger.error(f"❌ Simulate raw error: {e}")
+            self.send_error_response(client_socket, str(e))
+    
+    def validate_simulation_request(self, data):
+        """Return an error message if data isn't a valid /simulate request object, otherwise None"""
+        if not isinstance(data, dict):
+            return "Request body must be a JSON object"
+        for field, field_type in SIMULATE_REQUEST_FIELDS.items():
+            value = data.get(field)
+            if value is not None and not isinstance(value, field_type):
+                return f"Invalid {field}: expected {'an object' if field_type is dict else 'a string'}"
+        if not data.get('idf_content'):
+            return "Missing idf_content"
+        return None
+    
+    def run_simulation_request(self, data, base_url=None):
+        """Run one simulation from a /simulate request object (idf_content, weather_content, measured_data)"""
+        # Extract IDF and weather content
+        idf_content = data.get('idf_content', '')
+        weather_content = data.get('weather_content') or ''
+        measured_data = data.get('measured_data', None)
+        
+        # Validate weather content (check for empty/whitespace-only) without copying it
+        if weather_content and weather_content.isspace():
+            logger.warning("⚠️  Weather content is whitespace-only, treating as empty")
+            weather_content = ''
+        
+        # Check for extremely large weather files (warn if > 10 MB)
+        if weather_content and len(weather_content) > 10 * 1024 * 1024:
+            logger.warning(f"⚠️  Large weather file: {len(weather_content) / 1024 / 1024:.1f} MB (may cause memory issues)")
+        
+        logger.info(f"📊 IDF content: {len(idf_content)} bytes")
+        logger.info(f"📊 Weather content: {len(weather_content)} bytes")
+        if measured_data:
+            logger.info(f"📊 Measured data provided: {measured_data.get('total_annual_kwh', 'N/A')} kWh")
+        
+        # For Railway, we need to send a keep-alive or process quickly
+        # Reduce simulation timeout to match Railway's limits better
+        # Run simulation with reduced timeout for Railway compatibility
+        logger.info("⚡ Starting simulation (Railway-optimized)...")
+        result = self.run_energyplus_simulation(idf_content, weather_content, base_url)
+        
+        # Compare with measured data if provided
+        if measured_data and result.get('simulation_status') == 'success':
+            comparison = self.compare_measured_data(result, measured_data)
+            if comparison:
+                result.update(comparison)
+        
+        return result
+    
+    def simulate_many(self, simulations, base_url=None):
+        """Run several /simulate request objects concurrently, returning results in input order
+        
+        EnergyPlus runs as a subprocess, so threads overlap the runs without contending for the GIL.
+        """
+        def simulate_one(data):
+            request_error = self.validate_simulation_request(data)
+            if request_error:
+                return self.create_error_response(request_error)
+            try:
+                return self.run_simulation_request(data, base_url)
+            except Exception as e:
+                logger.error(f"❌ Batch simulation error: {e}")
+                return self.create_error_response(str(e))
+        
+        workers = max(1, min(self.simulation_batch_workers, len(simulations)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='simulate-batch') as pool:
+            return list(pool.map(simulate_one, simulations))
+    
+    def handle_simulate_batch(self, client_socket, body, base_url=None, pretty=False):
+        """Handle batch simulation request (body: {"simulations": [<simulate request>, ...]})"""
+        try:
+            client_socket.settimeout(600.0)  # 10 minutes for entire request
+            
+            logger.info(f"📊 Batch request body size: {len(body)} bytes")
+            
+            try:
+                data = self.decode_json(body)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                logger.error(f"❌ JSON parse error: {e}")
+                self.send_error_response(client_socket, f"Invalid JSON: {str(e)}")
+                return
+            
+            simulations = data.get('simulations') if isinstance(data, dict) else None
+            if not simulations or not isinstance(simulations, list):
+                self.send_error_response(client_socket, "Missing simulations")
+                return
+            if len(simulations) > self.max_batch_size:
+                self.send_error_response(client_socket, f"Too many simulations: {len(simulations)} (limit {self.max_batch_size})")
+                return
+            
+            logger.info(f"⚡ Starting batch of {len(simulations)} simulations...")
+            results = self.simulate_many(simulations, base_url)
+            
+            self.send_json_response(client_socket, {
+                "version": self.version,
+                "simulation_count": len(results),
+                "results": results,
+            }, pretty=pretty)
+            
+        except socket.timeout:
+            error_msg = "Request timed out - simulation took too long"
+            logger.error(f"❌ {error_msg}")
+            self.send_error_response(client_socket, error_msg)
+        except Exception as e:
+            logger.error(f"❌ Simulate batch error: {e}")
+            self.send_error_response(client_socket, str(e))
+    
+    def decode_json(self, body):
+        """Parse a JSON request body from bytes (orjson when available)"""
+        if orjson is not None:
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                # orjson rejects a few inputs json accepts (NaN/Infinity, >64-bit ints) - let json
+                # decide, which also keeps its error messages for genuinely invalid bodies
+                pass
+        return json.loads(body)
+    
+    def add_timestamp(self, body_prefix):
+        """Close a pre-serialized JSON body prefix with the current timestamp as its last field"""
+        timestamp = datetime.now().isoformat()
+        return body_prefix + f',"timestamp":"{timestamp}"}}'.encode('ascii')
+    
+    def encode_json(self, data, pretty=False):
+        """Serialize response data to UTF-8 JSON bytes (orjson when available, compact unless pretty)"""
+        if orjson is not None:
+            try:
+                option = orjson.OPT_NON_STR_KEYS
+                if pretty:
+                    option |= orjson.OPT_INDENT_2
+                return orjson.dumps(data, option=option)
+            except TypeError:
+                # orjson is stricter about some types (e.g. int subclasses, huge ints) - use json
+                pass
+        if pretty:
+            return json.dumps(data, indent=2).encode('utf-8')
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+    
+    def send_json_response(self, client_socket, data, json_data=None, pretty=False, status=b"200 OK", drain=False):
+        """Send JSON HTTP response (json_data: body already serialized, skips encoding data;
+        drain: the request body wasn't read - discard what the client still sends before closing)"""
+        try:
+            if json_data is None:
+                json_data = self.encode_json(data, pretty)
+            # Header and body stay bytes - no str response to build and re-encode
+            header = JSON_RESPONSE_HEADER % (status, len(json_data))
+            
+            # sendall already loops until everything is written, so no manual chunking.
+            # Large bodies go out with the header in one sendmsg call (gather write) rather than
+            # being copied into one buffer with it; sendall finishes any partial write
+            if len(json_data) > 100000:  # > 100KB
+                logger.info(f"📤 Sending large response ({len(header) + len(json_data)} bytes)...")
+                sent = client_socket.sendmsg([header, json_data])
+                if sent < len(header):
+                    client_socket.sendall(header[sent:])
+                    client_socket.sendall(json_data)
+                elif sent < len(header) + len(json_data):
+                    client_socket.sendall(memoryview(json_data)[sent - len(header):])
             else:
-                client_socket.sendall(response_bytes)
+                client_socket.sendall(header + json_data)
             
-            logger.info(f"✅ Response sent: {len(response_bytes)} bytes")
+            logger.info(f"✅ Response sent: {len(header) + len(json_data)} bytes")
         except Exception as e:
             logger.error(f"❌ Send response error: {e}")
             import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
         finally:
+            if drain:
+                self.drain_connection(client_socket)
             try:
                 client_socket.close()
             except:
                 pass
     
-    def send_error_response(self, client_socket, error_msg):
-        """Send error HTTP response"""
+    def drain_connection(self, client_socket):
+        """Half-close after a response and read and discard the rest of the request (bounded), so closing
+        doesn't reset a connection the client is still uploading on before it has read the response"""
+        try:
+            client_socket.shutdown(socket.SHUT_WR)
+            deadline = time.monotonic() + REQUEST_DRAIN_TIMEOUT
+            discard = bytearray(RECV_BUFFER_SIZE)
+            drained = 0
+            while drained < REQUEST_DRAIN_LIMIT:
+                received_now = self.recv_into_before(client_socket, discard, deadline)
+                if not received_now:
+                    break
+                drained += received_now
+        except OSError:
+            # Includes socket.timeout - the drain is best effort
+            pass
+    
+    def send_error_response(self, client_socket, error_msg, status=b"200 OK", drain=False):
+        """Send error HTTP response (status: HTTP status line text, errors are 200 unless given;
+        drain: see send_json_response)"""
         try:
+            body_prefix = self.error_body_prefixes.get(error_msg)
+            if body_prefix is not None:
+                self.send_json_response(client_socket, None, json_data=self.add_timestamp(body_prefix), status=status, drain=drain)
+                return
             response_data = {
                 "version": self.version,
                 "simulation_status": "error",
                 "error_message": error_msg,
                 "timestamp": datetime.now().isoformat()
             }
-            self.send_json_response(client_socket, response_data)
+            self.send_json_response(client_socket, response_data, status=status, drain=drain)
         except:
             client_socket.close()
     
-    def start_server(self):
-        """Start HTTP server"""
+    def start_server(self, reuse_port=False):
+        """Start HTTP server (reuse_port: share the port with sibling worker processes)"""
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            # Each worker process binds its own socket - the kernel spreads connections across them
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        # Set on the listening socket so accepted connections inherit the sizes from the
+        # handshake on (a receive buffer set after accept can't widen the advertised window scale)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
         server_socket.bind((self.host, self.port))
-        server_socket.listen(5)
+        server_socket.listen(LISTEN_BACKLOG)
         
         logger.info(f"🚀 Robust EnergyPlus API v{self.version} running on {self.host}:{self.port}")
+        logger.info(f"🧵 Request workers: {self.max_workers} (+{self.reserved_workers} reserved for health/download)")
         logger.info("📊 NO MOCK DATA - Only real simulation results!")
         
-        while True:
-            client_socket, addr = server_socket.accept()
-            client_thread = threading.Thread(target=self.handle_request, args=(client_socket,))
-            client_thread.daemon = True
-            client_thread.start()
+        # Hand connections to a fixed pool of worker threads instead of a new thread per request.
+        # A connection accepted while every regular worker is busy runs on a reserved one, which
+        # serves /health and /download and answers anything else with 503 (load shedding, not
+        # queueing). Only accept when a regular or reserved worker is free - otherwise connections
+        # would pile up in the executor's unbounded queue; they wait in the listen backlog instead
+        request_pool = ThreadPoolExecutor(max_workers=self.max_workers + self.reserved_workers, thread_name_prefix='request')
+        free_slots = threading.BoundedSemaphore(self.max_workers + self.reserved_workers)
+        free_workers = threading.BoundedSemaphore(self.max_workers)
+        
+        def release_worker(_):
+            free_workers.release()
+            free_slots.release()
+        
+        def release_reserved_worker(_):
+            free_slots.release()
+        
+        try:
+            while True:
+                free_slots.acquire()
+                client_socket, addr = server_socket.accept()
+                # Responses are written in one go - don't let Nagle hold back the last segment
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                if free_workers.acquire(blocking=False):
+                    request_pool.submit(self.handle_request, client_socket).add_done_callback(release_worker)
+                else:
+                    request_pool.submit(self.handle_request, client_socket, True).add_done_callback(release_reserved_worker)
+        finally:
+            request_pool.shutdown(wait=False)
+            server_socket.close()
+
+def fork_worker_processes(count):
+    """Fork count - 1 child processes; the parent and every child then run their own server
+    
+    Returns the child PIDs in the parent and None in a child.
+    Must be called before RobustEnergyPlusAPI is created - it starts threads, which don't survive fork.
+    """
+    children = []
+    for _ in range(count - 1):
+        pid = os.fork()
+        if pid == 0:
+            return None
+        children.append(pid)
+    return children
+
+
+def watch_worker_process(pid):
+    """Wait for a forked worker process so it doesn't linger as a zombie, and log how it ended"""
+    # Waits on this PID only - waitpid(-1) would also reap the parent's EnergyPlus subprocesses
+    try:
+        _, status = os.waitpid(pid, 0)
+    except ChildProcessError:
+        return
+    logger.warning(f"⚠️  Worker process {pid} exited (code {os.waitstatus_to_exitcode(status)})")
+
 
 if __name__ == "__main__":
-    api = RobustEnergyPlusAPI()
-    api.start_server()
+    # WORKER_PROCESSES > 1 runs several server processes on one port (SO_REUSEPORT, Linux) so
+    # request handling and output parsing aren't limited to one interpreter's GIL
+    worker_processes = int(os.environ.get('WORKER_PROCESSES', 1))
+    children = []
+    if worker_processes > 1 and hasattr(socket, 'SO_REUSEPORT'):
+        children = fork_worker_processes(worker_processes)
+    else:
+        worker_processes = 1
+    
+    watchers = []
+    if children:
+        # The parent reaps its children and passes SIGTERM (platform shutdown) on to them
+        for pid in children:
+            watcher = threading.Thread(target=watch_worker_process, args=(pid,), daemon=True)
+            watcher.start()
+            watchers.append(watcher)
+        
+        def stop_worker_processes(signum, frame):
+            for pid in children:
+                try:
+                    os.kill(pid, signum)
+                except ProcessLookupError:
+                    pass
+            raise SystemExit(0)
+        
+        signal.signal(signal.SIGTERM, stop_worker_processes)
+    
+    api = RobustEnergyPlusAPI(worker_processes, run_cleanup=children is not None)
+    try:
+        api.start_server(reuse_port=worker_processes > 1)
+    finally:
+        for watcher in watchers:
+            watcher.join(timeout=10)
 
@@ -10,6 +10,7 @@ Usage:
 """
 
 import os
+import re
 import sys
 import json
 import sqlite3
@@ -24,6 +25,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Building area in the HTML summary (compiled once rather than on every extract_from_html call)
+HTML_TOTAL_AREA_PATTERN = re.compile(r'Total Building Area[^<]*?(\d+\.?\d*)\s*m²', re.IGNORECASE)
+
 
 class EnergyExtractor:
     """Extract energy data from EnergyPlus output files"""
@@ -228,10 +232,8 @@ class EnergyExtractor:
             
             energy_data = {}
             # Simple extraction - look for kWh values in tables
-            import re
-            
             # Find building area
-            area_match = re.search(r'Total Building Area[^<]*?(\d+\.?\d*)\s*m²', content, re.IGNORECASE)
+            area_match = HTML_TOTAL_AREA_PATTERN.search(content)
             if area_match:
                 energy_data['building_area'] = float(area_match.group(1))
             